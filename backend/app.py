@@ -6,24 +6,39 @@ A REST API for ticketing, events, and seat reservations backed by SQLite.
 # =============================================================================
 # IMPORTS
 # =============================================================================
-import json
+import hashlib
+import inspect
 import os
+import queue
 import sqlite3
-import uuid
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from functools import wraps
+from functools import lru_cache, wraps
 
 from dotenv import load_dotenv
 from flask import Flask, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
 from flask_jwt_extended import (
     JWTManager,
     create_access_token,
     create_refresh_token,
-    get_jwt_identity,
+    get_current_user as _get_loaded_jwt_user,
+    get_jwt,
     jwt_required,
+    verify_jwt_in_request,
 )
-from werkzeug.security import check_password_hash, generate_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.security import check_password_hash
+import orjson
 import stripe
 
 
@@ -33,20 +48,93 @@ import stripe
 # Load environment variables from .env file
 load_dotenv()
 
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson, which encodes large seat and event lists
+    several times faster than the stdlib encoder. sqlite3.Row values are
+    serialized as dicts, so rows can be returned without copying them first.
+    """
+
+    @staticmethod
+    def _default(obj):
+        if isinstance(obj, sqlite3.Row):
+            return dict(obj)
+        return DefaultJSONProvider.default(obj)
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self._default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
+# Compress JSON responses; seat maps and event lists shrink several times over
+app.config["COMPRESS_ALGORITHM"] = ['br', 'gzip']
+app.config["COMPRESS_MIN_SIZE"] = 500
+app.config["COMPRESS_MIMETYPES"] = ['application/json']
+Compress(app)
+
+# Behind a reverse proxy (Render runs one), trust that many X-Forwarded-For hops
+# so rate limits see the client's address rather than the proxy's
+TRUSTED_PROXY_COUNT = int(os.environ.get("TRUSTED_PROXY_COUNT", 0))
+if TRUSTED_PROXY_COUNT:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_COUNT)
+
+# Per-IP limits on the endpoints that run a password hash check. The default
+# memory:// storage counts per worker; point it at Redis to share counters
+PASSWORD_RATE_LIMIT = os.environ.get("PASSWORD_RATE_LIMIT", "5/minute")
+limiter = Limiter(
+    get_remote_address,
+    app=app,
+    storage_uri=os.environ.get("RATELIMIT_STORAGE_URI", "memory://"),
+)
+
+
+@app.errorhandler(429)
+def rate_limited(e):
+    return jsonify({'error': f'Too many attempts, please wait and retry ({e.description})'}), 429
+
 # Stripe configuration - MUST be set via environment variable
 stripe.api_key = os.environ.get("STRIPE_SECRET_KEY")
 if not stripe.api_key:
     raise RuntimeError("STRIPE_SECRET_KEY environment variable is required")
+# One shared HTTP client with a short timeout so a slow Stripe call cannot pin
+# a worker for long. It keeps the SDK's own per-thread requests.Session (each
+# pooled with keep-alive), since a Session is not documented as thread-safe.
+STRIPE_TIMEOUT_SECONDS = float(os.environ.get("STRIPE_TIMEOUT_SECONDS", 10))
+stripe.default_http_client = stripe.RequestsClient(timeout=STRIPE_TIMEOUT_SECONDS)
+
+
+def _warm_stripe_connection():
+    """
+    Make one Stripe call at startup so the SDK's lazy setup and the DNS lookup
+    are done before the first checkout. The TLS connection itself belongs to
+    this thread's session; request threads open their own and keep them alive.
+    """
+    try:
+        stripe.Balance.retrieve()
+    except Exception:
+        pass
+
+
+if os.environ.get("STRIPE_WARMUP", "true").lower() == "true":
+    threading.Thread(target=_warm_stripe_connection, daemon=True).start()
 
 # JWT configuration
 app.config["JWT_SECRET_KEY"] = os.environ.get("JWT_SECRET_KEY", "dev-secret-change-in-production")
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(minutes=15)
 app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=14)
 
-jwt = JWTManager(app)
+# Password hashing - argon2id with its cost pinned so it does not drift with the library default
+password_hasher = PasswordHasher(
+    time_cost=int(os.environ.get("ARGON2_TIME_COST", 2)),
+    memory_cost=int(os.environ.get("ARGON2_MEMORY_COST", 65536)),
+    parallelism=int(os.environ.get("ARGON2_PARALLELISM", 1)),
+)
 
 
 # =============================================================================
@@ -55,35 +143,770 @@ jwt = JWTManager(app)
 # Database path - use environment variable or default to local database folder
 # Local dev: ../database/tessera.db | Production (Render): set DATABASE_PATH=data/tessera.db
 DB_PATH = os.environ.get('DATABASE_PATH', '../database/tessera.db')
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 8))
+# SQLite allows one writer at a time; queueing writers in the pool is cheaper
+# than letting them contend for the database lock
+DB_WRITE_POOL_SIZE = int(os.environ.get('DB_WRITE_POOL_SIZE', 1))
+
+# Applied once to each pooled connection when it is first opened
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA busy_timeout = 5000',
+    'PRAGMA foreign_keys = ON',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -65536',
+    'PRAGMA mmap_size = 268435456',
+)
+# Reader connections refuse writes, so a handler that forgets write=True fails
+# loudly instead of contending with the writer pool for the lock
+READ_ONLY_PRAGMAS = ('PRAGMA query_only = ON',)
+# Writers run the automatic WAL checkpoints, so pin how often they happen
+WRITE_PRAGMAS = ('PRAGMA wal_autocheckpoint = 1000',)
+
+
+class ConnectionPool:
+    """
+    Bounded pool of long-lived SQLite connections shared by all requests.
+    Connections are opened lazily and configured once, so a request only pays
+    for a queue checkout instead of a file open and PRAGMA setup. They run in
+    autocommit mode: a lone statement commits itself, and anything that needs
+    several statements to be atomic uses immediate_transaction.
+    """
+
+    def __init__(self, path, size, pragmas=()):
+        self.path = path
+        self.pragmas = CONNECTION_PRAGMAS + tuple(pragmas)
+        self._idle = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            # None marks a slot whose connection has not been opened yet
+            self._idle.put(None)
+
+    def _connect(self):
+        # 256 cached statements is several times the app's distinct SQL, so a
+        # pooled connection never re-prepares a hot query
+        conn = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False, cached_statements=256
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection, returning it to the pool when the block exits."""
+        conn = self._idle.get()
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                self._idle.put(None)
+                raise
+        try:
+            yield conn
+        except sqlite3.IntegrityError:
+            # A constraint violation leaves the connection itself healthy
+            self._release(conn)
+            raise
+        except BaseException:
+            # Anything else may have left it mid-statement; replace it lazily
+            conn.close()
+            self._idle.put(None)
+            raise
+        else:
+            self._release(conn)
+
+    def _release(self, conn):
+        # Never hand the next request a connection with a half-done transaction
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+
+_pool = ConnectionPool(DB_PATH, DB_POOL_SIZE, READ_ONLY_PRAGMAS)
+_write_pool = ConnectionPool(DB_PATH, DB_WRITE_POOL_SIZE, WRITE_PRAGMAS)
+
+
+@contextmanager
+def immediate_transaction(conn):
+    """
+    Run a block as one BEGIN IMMEDIATE transaction: commit when it exits normally
+    (including early returns), roll back if it raises. Taking the write lock up
+    front means seat status checks and the writes that follow cannot interleave
+    with another request's.
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def get_db_connection(write=False):
+    """
+    Return a pooled SQLite connection (rows are dict-like sqlite3.Row objects).
+    Use as a context manager: ``with get_db_connection() as conn:``.
+    Handlers that write must pass write=True to use the single-writer pool.
+    """
+    return (_write_pool if write else _pool).connection()
+
+
+# Listings stay unbounded unless the client asks for a page (LIMIT -1 is no limit),
+# so paged and unpaged calls share one statement
+MAX_PAGE_SIZE = 200
+# Above any order_id, for the first page of a keyset-paged listing
+NO_CURSOR = 2 ** 63 - 1
+
+
+def page_args():
+    """Return (limit, offset) from the optional ?page=&page_size= query args."""
+    page_size = request.args.get('page_size', type=int)
+    if page_size is None:
+        return -1, 0
+    page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+    page = max(request.args.get('page', 1, type=int), 1)
+    return page_size, (page - 1) * page_size
+
+
+def fetch_dicts(cursor):
+    """Fetch the remaining rows as plain dicts, reading the column names once."""
+    cols = [c[0] for c in cursor.description]
+    return [dict(zip(cols, row)) for row in cursor.fetchall()]
+
+
+# =============================================================================
+# SQL QUERIES
+# =============================================================================
+# Hot read queries, built once at import. Pooled connections keep their prepared
+# statements in sqlite3's per-connection cache, keyed on these strings.
+
+SQL_LOGIN = 'SELECT user_id, username, email, password_hash, role FROM Users WHERE username = ?'
+
+SQL_USER_PASSWORD_HASH = 'SELECT password_hash FROM Users WHERE user_id = ?'
+
+SQL_VENUES = 'SELECT venue_id, venue_name, city, state, country, timezone FROM Venues'
+
+SQL_VENUE_EXISTS = 'SELECT 1 FROM Venues WHERE venue_id = ?'
+
+SQL_VENUE_SEATS = '''
+    SELECT seat_id, venue_id, row_label, seat_number, col_index, section, orientation
+    FROM Seats WHERE venue_id = ? ORDER BY row_label, col_index
+    LIMIT ? OFFSET ?
+'''
+
+SQL_EVENTS = '''
+    SELECT e.event_id, e.venue_id, e.event_name, e.start_datetime, e.image_url, e.status,
+           v.venue_name, v.city, v.state, v.country
+    FROM Events e
+    LEFT JOIN Venues v ON e.venue_id = v.venue_id
+'''
+
+# A separate statement rather than "? IS NULL OR ...", which would rule out the index
+SQL_EVENTS_AFTER = SQL_EVENTS + '    WHERE e.start_datetime > ?\n'
+
+# The event listing is encoded by SQLite itself into one JSON array string
+EVENTS_JSON_SELECT = '''
+    SELECT json_group_array(json_object(
+        'event_id', event_id, 'venue_id', venue_id, 'event_name', event_name,
+        'start_datetime', start_datetime, 'image_url', image_url, 'status', status,
+        'venue_name', venue_name, 'city', city, 'state', state, 'country', country
+    ))
+    FROM ({})
+'''
+EVENTS_PAGE = '    ORDER BY e.event_id\n    LIMIT ? OFFSET ?\n'
+SQL_EVENTS_JSON = EVENTS_JSON_SELECT.format(SQL_EVENTS + EVENTS_PAGE)
+SQL_EVENTS_AFTER_JSON = EVENTS_JSON_SELECT.format(SQL_EVENTS_AFTER + EVENTS_PAGE)
+
+SQL_EVENT = '''
+    SELECT e.event_id, e.venue_id, e.event_name, e.event_description,
+           e.start_datetime, e.image_url, e.status,
+           v.venue_name, v.city, v.state, v.country
+    FROM Events e
+    LEFT JOIN Venues v ON e.venue_id = v.venue_id
+    WHERE e.event_id = ?
+'''
+
+SQL_EVENT_SEATS = '''
+    SELECT seat_id, row_label, seat_number, col_index, section,
+           availability, price_cents, tier_name
+    FROM EventSeatView
+    WHERE event_id = ?
+    ORDER BY row_label, col_index
+'''
+
+SQL_EVENT_VENUE_STATUS = 'SELECT venue_id, status FROM Events WHERE event_id = ?'
+
+# Per-section rows followed by one grand-total row (is_total = 1), in emulation
+# of GROUP BY ROLLUP, which SQLite lacks
+SQL_EVENT_INVENTORY = '''
+    WITH by_section AS MATERIALIZED (
+        SELECT NULLIF(i.section, '') AS section, i.total_seats, i.available, i.held, i.sold,
+               esp.price_cents, esp.tier_name
+        FROM EventInventorySummary i
+        LEFT JOIN EventSectionPrice esp ON esp.event_id = i.event_id AND esp.section = i.section
+        WHERE i.event_id = ?
+    )
+    SELECT 0 AS is_total, * FROM by_section
+    UNION ALL
+    SELECT 1, NULL, TOTAL(total_seats), TOTAL(available), TOTAL(held), TOTAL(sold), NULL, NULL
+    FROM by_section
+    ORDER BY is_total, section
+'''
+
+SQL_USER_OPEN_CARTS = '''
+    SELECT c.cart_id, c.user_id, c.event_id, c.status, c.created_at, c.expires_at,
+           e.event_name, e.start_datetime, e.image_url, v.venue_name
+    FROM Carts c
+    JOIN Events e ON c.event_id = e.event_id
+    LEFT JOIN Venues v ON e.venue_id = v.venue_id
+    WHERE c.user_id = ? AND c.status = 'OPEN'
+    ORDER BY c.created_at DESC
+'''
+
+SQL_USER_OPEN_CART_SEATS = '''
+    SELECT cs.cart_id, s.seat_id, s.row_label, s.seat_number, s.section
+    FROM Carts c
+    JOIN CartSeats cs ON cs.cart_id = c.cart_id
+    JOIN Seats s ON cs.seat_id = s.seat_id
+    WHERE c.user_id = ? AND c.status = 'OPEN'
+    ORDER BY cs.seat_id
+'''
+
+# One row per seat; an empty cart comes back as a single row with NULL seat columns
+SQL_OPEN_CART = '''
+    SELECT c.cart_id, c.event_id, c.expires_at_epoch, e.event_name,
+           s.seat_id, s.section, s.row_label, s.seat_number
+    FROM Carts c
+    JOIN Events e ON c.event_id = e.event_id
+    LEFT JOIN CartSeats cs ON cs.cart_id = c.cart_id
+    LEFT JOIN Seats s ON cs.seat_id = s.seat_id
+    WHERE c.cart_id = ? AND c.user_id = ? AND c.status = 'OPEN'
+'''
+
+SQL_USER_ORDERS = '''
+    SELECT o.order_id, o.user_id, o.event_id, o.created_at, o.status, o.total_cents,
+           e.event_name, e.start_datetime, v.venue_name
+    FROM Orders o
+    JOIN Events e ON o.event_id = e.event_id
+    LEFT JOIN Venues v ON e.venue_id = v.venue_id
+    WHERE o.user_id = ? AND o.order_id < ?
+    ORDER BY o.order_id DESC
+    LIMIT ?
+'''
+
+SQL_USER_ORDER_TICKETS = '''
+    SELECT oi.order_id, t.ticket_id, t.barcode_num, t.status as ticket_status,
+           s.row_label, s.seat_number, s.section,
+           oi.unit_price_cents
+    FROM OrderItems oi
+    JOIN Tickets t ON t.order_item_id = oi.order_item_id
+    JOIN Seats s ON oi.seat_id = s.seat_id
+    WHERE oi.order_id IN (SELECT value FROM json_each(?))
+    ORDER BY t.ticket_id
+'''
+
+SQL_TICKET_DETAIL = '''
+    SELECT ticket_id, user_id, event_id, barcode_num, status, issued_at,
+           unit_price_cents, row_label, seat_number, section,
+           event_name, start_datetime, venue_name, city
+    FROM TicketView
+    WHERE ticket_id = ?
+'''
+
+
+# Hot seat, cart and ticket writes, shared by the reservation and purchase paths
+SQL_USER_EVENT_OPEN_CART = '''
+    SELECT cart_id FROM Carts
+    WHERE user_id = ? AND event_id = ? AND status = 'OPEN'
+'''
+
+SQL_INSERT_CART = '''
+    INSERT INTO Carts (user_id, event_id, status, expires_at, expires_at_epoch)
+    VALUES (?, ?, 'OPEN', ?, ?)
+'''
+
+SQL_EXTEND_CART = 'UPDATE Carts SET expires_at = ?, expires_at_epoch = ? WHERE cart_id = ?'
+
+SQL_INSERT_CART_SEAT = 'INSERT OR IGNORE INTO CartSeats (cart_id, seat_id) VALUES (?, ?)'
+
+SQL_UPSERT_HELD = '''
+    INSERT INTO EventSeatStatus (event_id, seat_id, status, held_by_cart_id, hold_expires_at, updated_at)
+    VALUES (?, ?, 'HELD', ?, ?, datetime('now'))
+    ON CONFLICT(event_id, seat_id) DO UPDATE SET
+        status = 'HELD',
+        held_by_cart_id = excluded.held_by_cart_id,
+        hold_expires_at = excluded.hold_expires_at,
+        updated_at = datetime('now')
+'''
+
+SQL_EXPIRE_CART = "UPDATE Carts SET status = 'EXPIRED' WHERE cart_id = ?"
+
+SQL_CONVERT_CART = "UPDATE Carts SET status = 'CONVERTED' WHERE cart_id = ?"
+
+SQL_EMPTY_CART = 'DELETE FROM CartSeats WHERE cart_id = ?'
+
+SQL_INSERT_ORDER = '''
+    INSERT INTO Orders (user_id, event_id, status, total_cents)
+    VALUES (?, ?, 'PAID', ?)
+'''
+
+# Order issuing inserts every row of a batch in one statement from a JSON array
+# of [seat_id, price_cents] / [order_item_id, barcode] pairs
+SQL_INSERT_ORDER_ITEMS = '''
+    INSERT INTO OrderItems (order_id, seat_id, unit_price_cents, line_total_cents)
+    SELECT ?, json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[1]')
+    FROM json_each(?)
+    RETURNING order_item_id, seat_id
+'''
+
+SQL_INSERT_TICKETS = '''
+    INSERT INTO Tickets (order_item_id, barcode_num, status)
+    SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), 'ISSUED'
+    FROM json_each(?)
+    RETURNING ticket_id, order_item_id
+'''
+
+SQL_MARK_SOLD = '''
+    UPDATE EventSeatStatus
+    SET status = 'SOLD', held_by_cart_id = NULL, hold_expires_at = NULL, updated_at = datetime('now')
+    WHERE event_id = ? AND seat_id IN (SELECT value FROM json_each(?))
+'''
+
+# Ticket status changes update only when the transition is allowed; an empty
+# RETURNING means the caller must look up why
+SQL_SCAN_TICKET = '''
+    UPDATE Tickets SET status = 'SCANNED'
+    WHERE ticket_id = ? AND status = 'ISSUED'
+    RETURNING ticket_id
+'''
+
+SQL_VOID_TICKET = '''
+    UPDATE Tickets SET status = 'VOIDED'
+    WHERE ticket_id = ? AND status != 'VOIDED'
+    RETURNING
+        (SELECT oi.seat_id FROM OrderItems oi
+         WHERE oi.order_item_id = Tickets.order_item_id) AS seat_id,
+        (SELECT o.event_id FROM OrderItems oi JOIN Orders o ON oi.order_id = o.order_id
+         WHERE oi.order_item_id = Tickets.order_item_id) AS event_id
+'''
+
+SQL_TICKET_STATUS = 'SELECT status FROM Tickets WHERE ticket_id = ?'
+
+SQL_RELEASE_VOIDED_SEAT = '''
+    UPDATE EventSeatStatus
+    SET status = 'AVAILABLE', updated_at = datetime('now')
+    WHERE event_id = ? AND seat_id = ?
+'''
+
+# Admin maintenance
+SQL_USER_EMAILS = "SELECT email FROM Users WHERE email != ''"
+
+# The holding carts come back as one JSON array, ready to bind to json_each(?)
+SQL_EXPIRED_HOLD_CARTS = '''
+    SELECT json_group_array(DISTINCT held_by_cart_id) AS cart_ids,
+           COUNT(DISTINCT held_by_cart_id) AS cart_count
+    FROM EventSeatStatus
+    WHERE status = 'HELD' AND hold_expires_at < ? AND held_by_cart_id IS NOT NULL
+'''
+
+SQL_RELEASE_EXPIRED_HOLDS = '''
+    UPDATE EventSeatStatus
+    SET status = 'AVAILABLE', held_by_cart_id = NULL, hold_expires_at = NULL, updated_at = datetime('now')
+    WHERE status = 'HELD' AND hold_expires_at < ?
+'''
+
+SQL_EXPIRE_CARTS = '''
+    UPDATE Carts SET status = 'EXPIRED'
+    WHERE cart_id IN (SELECT value FROM json_each(?)) AND status = 'OPEN'
+'''
+
+SQL_EMPTY_CARTS = 'DELETE FROM CartSeats WHERE cart_id IN (SELECT value FROM json_each(?))'
+
+# Batched lookups take their id list as one JSON array parameter expanded with
+# json_each, so the SQL text (and its prepared statement) is the same for every
+# batch size
+SQL_SEATS_HELD_BY_CART = '''
+    SELECT seat_id FROM EventSeatStatus
+    WHERE event_id = ? AND status = 'HELD' AND held_by_cart_id = ?
+      AND seat_id IN (SELECT value FROM json_each(?))
+'''
+
+SQL_SEAT_STATUSES = '''
+    SELECT seat_id, status FROM EventSeatStatus
+    WHERE event_id = ? AND seat_id IN (SELECT value FROM json_each(?))
+'''
+
+# Seats without a status row are available
+SQL_AVAILABLE_SECTION_SEATS = '''
+    SELECT s.seat_id
+    FROM Seats s
+    WHERE s.venue_id = ? AND s.section = ?
+      AND NOT EXISTS (
+          SELECT 1 FROM EventSeatStatus ess
+          WHERE ess.event_id = ? AND ess.seat_id = s.seat_id AND ess.status IN ('HELD', 'SOLD')
+      )
+    LIMIT ?
+'''
+
+SQL_SEAT_DETAILS = '''
+    SELECT seat_id, row_label, seat_number, section
+    FROM Seats
+    WHERE seat_id IN (SELECT value FROM json_each(?))
+'''
+
+# Scoped to the event's venue, so a seat id from another venue counts as missing
+SQL_VENUE_SEAT_SECTIONS = '''
+    SELECT seat_id, section
+    FROM Seats
+    WHERE venue_id = ? AND seat_id IN (SELECT value FROM json_each(?))
+'''
+
+SQL_SECTION_PRICING = '''
+    SELECT section, price_cents, tier_name
+    FROM EventSectionPrice
+    WHERE event_id = ? AND section IN (SELECT value FROM json_each(?))
+'''
+
+SQL_SEATS_OWNED_BY_CART = '''
+    SELECT seat_id FROM EventSeatStatus
+    WHERE event_id = ? AND held_by_cart_id = ?
+      AND seat_id IN (SELECT value FROM json_each(?))
+'''
+
+SQL_DELETE_CART_SEATS = '''
+    DELETE FROM CartSeats
+    WHERE cart_id = ? AND seat_id IN (SELECT value FROM json_each(?))
+'''
+
+SQL_RELEASE_SEATS = '''
+    UPDATE EventSeatStatus
+    SET status = 'AVAILABLE', held_by_cart_id = NULL, hold_expires_at = NULL, updated_at = datetime('now')
+    WHERE event_id = ? AND seat_id IN (SELECT value FROM json_each(?))
+'''
+
+SQL_EXPIRE_CART_IF_EMPTY = '''
+    UPDATE Carts SET status = 'EXPIRED'
+    WHERE cart_id = ? AND NOT EXISTS (SELECT 1 FROM CartSeats WHERE cart_id = ?)
+'''
+
+
+def json_array(values):
+    """Encode values as a JSON array string for binding to json_each(?)."""
+    return orjson.dumps(list(values)).decode()
+
+
+def is_int(value):
+    """True for a JSON integer (bool is an int subclass, so it is excluded)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def is_id_list(value):
+    """True for a list of integer ids, the shape seat_ids must arrive in."""
+    return isinstance(value, list) and all(is_int(item) for item in value)
+
+
+# Hot queries whose plans must stay index-driven, with placeholder parameters
+PLAN_CHECKED_QUERIES = (
+    ('ticket detail', SQL_TICKET_DETAIL, (1,)),
+    ('void ticket', SQL_VOID_TICKET, (1,)),
+    ('expired hold carts', SQL_EXPIRED_HOLD_CARTS, ('',)),
+    ('open cart', SQL_OPEN_CART, (1, 1)),
+    ('seat statuses', SQL_SEAT_STATUSES, (1, '[]')),
+    ('event seats', SQL_EVENT_SEATS, (1,)),
+    ('user orders', SQL_USER_ORDERS, (1, NO_CURSOR, -1)),
+)
+
+
+def check_query_plans(conn):
+    """
+    Log a warning for any hot query whose plan scans a table instead of
+    searching an index. Scans of json_each (a virtual table) are expected.
+    """
+    for label, sql, params in PLAN_CHECKED_QUERIES:
+        for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params):
+            detail = row[3]
+            if detail.startswith('SCAN') and 'VIRTUAL TABLE' not in detail:
+                app.logger.warning('Query plan for %s scans instead of searching: %s', label, detail)
+
+
+# Tables and columns added by init_db.py migrations that the handlers rely on
+REQUIRED_SCHEMA = {
+    'EventSeatView': (),
+    'EventInventorySummary': (),
+    'EventSectionPrice': (),
+    'TicketView': (),
+    'Carts': ('expires_at_epoch',),
+}
+
+
+def check_schema(conn):
+    """Raise if the database predates the current init_db.py schema."""
+    for table, columns in REQUIRED_SCHEMA.items():
+        present = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        missing = [column for column in columns if column not in present]
+        if not present or missing:
+            what = f'{table}.{missing[0]}' if present else table
+            raise RuntimeError(
+                f'Database {DB_PATH} is missing {what}; run "python init_db.py" to migrate it'
+            )
+
+
+with get_db_connection() as _conn:
+    check_schema(_conn)
+
+
+if os.environ.get('QUERY_PLAN_CHECK', 'true').lower() == 'true':
+    try:
+        with get_db_connection() as _conn:
+            check_query_plans(_conn)
+    except sqlite3.Error as e:
+        app.logger.warning('Skipped query plan check: %s', e)
+
+
+# =============================================================================
+# RESPONSE CACHE
+# =============================================================================
+class TTLCache:
+    """
+    Small thread-safe cache whose entries expire after ttl seconds. When full,
+    the least recently stored entry is evicted first.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard(self, match):
+        """Remove every entry whose key satisfies match(key)."""
+        with self._lock:
+            for key in [key for key in self._entries if match(key)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Read-mostly public listings; cleared by the admin endpoints that change them
+events_cache = TTLCache(maxsize=256, ttl=30)
+venues_cache = TTLCache(maxsize=256, ttl=30)
+# Availability changes often, so entries are also dropped on every seat write
+inventory_cache = TTLCache(maxsize=256, ttl=5)
+seat_map_cache = TTLCache(maxsize=256, ttl=5)
+
+
+def invalidate_inventory(event_id):
+    """Drop an event's cached inventory summary and seat map after its seats change."""
+    inventory_path = f'/events/{event_id}/inventory'
+    inventory_cache.discard(lambda key: key[0] == inventory_path)
+    seat_map_cache.pop((f'/events/{event_id}/seats', ()))
+
+
+def cached_response(cache):
+    """
+    Decorator that serves successful JSON responses from cache, keyed on the
+    request path and query string. The encoded body is stored, so a hit skips
+    both the SQL and the JSON encoding. Responses carry an ETag and may be
+    reused by clients for the cache's TTL; a client that already holds the
+    current body gets a bodiless 304.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (request.path, tuple(sorted(request.args.items(multi=True))))
+            entry = cache.get(key)
+            if entry is not None:
+                body, etag = entry
+                response = app.response_class(body, mimetype='application/json')
+            else:
+                response = app.make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+                cache.set(key, (body, etag))
+
+            response.set_etag(etag)
+            response.cache_control.public = True
+            response.cache_control.max_age = cache.ttl
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
 
-def get_db_connection():
-    """Return a SQLite connection object configured to return rows as dict-like objects."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+
+# =============================================================================
+# PRICING CACHE
+# =============================================================================
+# (event_id, section) -> (price_cents, tier_name); (None, None) if unpriced
+pricing_cache = TTLCache(maxsize=4096, ttl=30)
+
+
+def get_pricing(cursor, event_id, sections, fresh=False):
+    """
+    Return {section: (price_cents, tier_name)} for an event, serving cached
+    entries first and loading any misses in one query. The cache is per worker
+    and only for display; paths that charge pass fresh=True to read the
+    trigger-maintained EventSectionPrice directly.
+    """
+    pricing = {}
+    misses = []
+    for section in set(sections):
+        cached = None if fresh else pricing_cache.get((event_id, section))
+        if cached is None:
+            misses.append(section)
+        else:
+            pricing[section] = cached
+
+    if misses:
+        cursor.execute(SQL_SECTION_PRICING, (event_id, json_array(misses)))
+        loaded = {row['section']: (row['price_cents'], row['tier_name']) for row in cursor.fetchall()}
+        for section in misses:
+            pricing[section] = loaded.get(section, (None, None))
+            pricing_cache.set((event_id, section), pricing[section])
+
+    return pricing
+
+
+def invalidate_pricing(event_id):
+    """Drop an event's cached section prices after its pricing changes."""
+    pricing_cache.discard(lambda key: key[0] == event_id)
+
+
+# event_id -> {'venue_id', 'status'}; cleared by the admin event endpoints
+event_meta_cache = TTLCache(maxsize=1024, ttl=30)
+
+
+def get_event_meta(cursor, event_id, fresh=False):
+    """
+    Return an event's venue_id and status, or None if it does not exist.
+    The cache is per worker, so write transactions that sell seats pass
+    fresh=True to read the row itself instead of trusting another worker's
+    admin update to have reached this one.
+    """
+    meta = None if fresh else event_meta_cache.get(event_id)
+    if meta is None:
+        cursor.execute(SQL_EVENT_VENUE_STATUS, (event_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        meta = dict(row)
+        event_meta_cache.set(event_id, meta)
+    return meta
 
 
 # =============================================================================
 # JWT CONFIGURATION & HELPERS
 # =============================================================================
+# blake2b(token) -> decoded claims, so repeat requests skip the HMAC check
+verified_token_cache = TTLCache(maxsize=10000, ttl=30)
+
+
+# The cache hooks JWTManager._decode_jwt_from_config, a private method that
+# flask_jwt_extended.utils.decode_token calls for every verified request (4.7.x;
+# requirements.txt pins that minor). Fail at import rather than silently skip
+# the cache, or break auth, if an upgrade renames it or changes its arguments.
+_decode_jwt = getattr(JWTManager, '_decode_jwt_from_config', None)
+if _decode_jwt is None or list(inspect.signature(_decode_jwt).parameters) != [
+    'self', 'encoded_token', 'csrf_value', 'allow_expired'
+]:
+    raise RuntimeError('Unsupported flask_jwt_extended: JWTManager._decode_jwt_from_config changed')
+
+
+class CachingJWTManager(JWTManager):
+    """
+    JWTManager that remembers recently verified tokens. A cached token is only
+    reused while its own exp claim is in the future; otherwise it goes back
+    through the normal decode path, which raises the usual expiry error.
+    """
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        key = hashlib.blake2b(encoded_token.encode(), digest_size=16).digest()
+        claims = verified_token_cache.get(key)
+        if claims is not None and claims.get('exp', 0) > time.time():
+            return claims
+
+        claims = super()._decode_jwt_from_config(encoded_token)
+        verified_token_cache.set(key, claims)
+        return claims
+
+
+jwt = CachingJWTManager(app)
+
+
 @jwt.user_identity_loader
 def user_identity_lookup(user):
-    """Convert user dict to JSON string for JWT subject."""
+    """Use the user_id as the JWT subject."""
     if isinstance(user, dict):
-        return json.dumps(user)
-    return user
+        return str(user['user_id'])
+    return str(user)
+
+
+@jwt.additional_claims_loader
+def add_user_claims(user):
+    """Carry the remaining user fields as flat claims alongside the subject."""
+    if isinstance(user, dict):
+        return {
+            'username': user.get('username'),
+            'email': user.get('email'),
+            'role': user.get('role')
+        }
+    return {}
 
 
 @jwt.user_lookup_loader
 def user_lookup_callback(_jwt_header, jwt_data):
-    """Load user from JWT - returns the identity."""
-    identity = jwt_data["sub"]
-    if isinstance(identity, str):
-        try:
-            return json.loads(identity)
-        except json.JSONDecodeError:
-            return identity
-    return identity
+    """
+    Build the user dict from the JWT claims. flask_jwt_extended calls this
+    once per request and caches the result. Tokens issued before the subject
+    became a plain user_id carry a JSON string there; returning None makes
+    flask_jwt_extended answer 401, so the client refreshes or signs in again.
+    """
+    try:
+        user_id = int(jwt_data['sub'])
+    except (TypeError, ValueError):
+        return None
+    return {
+        'user_id': user_id,
+        'username': jwt_data.get('username'),
+        'email': jwt_data.get('email'),
+        'role': jwt_data.get('role')
+    }
+
+
+@jwt.user_lookup_error_loader
+def user_lookup_error_callback(_jwt_header, _jwt_data):
+    """Reject tokens whose subject is not a user_id with a plain 401."""
+    return jsonify({'error': 'Session is no longer valid, please sign in again'}), 401
 
 
 def get_current_user():
@@ -91,28 +914,25 @@ def get_current_user():
     Helper function to get the current user identity as a dictionary.
     Use this instead of get_jwt_identity() directly.
     """
-    identity = get_jwt_identity()
-    if isinstance(identity, str):
-        try:
-            return json.loads(identity)
-        except json.JSONDecodeError:
-            return {'user_id': identity}
-    return identity
+    return _get_loaded_jwt_user()
 
 
 # =============================================================================
 # ROLE-BASED ACCESS CONTROL DECORATORS
 # =============================================================================
+USER_ROLES = frozenset({'CUSTOMER', 'ADMIN'})
+
+
 def admin_required():
     """
-    Custom decorator that requires the user to have 'ADMIN' role.
-    Must be used AFTER @jwt_required() decorator.
+    Custom decorator that requires a valid access token with the 'ADMIN' role.
+    Verifies the JWT itself, so it replaces @jwt_required() rather than following it.
     """
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            current_user = get_current_user()
-            if current_user.get('role') != 'ADMIN':
+            verify_jwt_in_request()
+            if get_jwt().get('role') != 'ADMIN':
                 return jsonify({'error': 'Admin access required'}), 403
             return fn(*args, **kwargs)
         return wrapper
@@ -129,13 +949,92 @@ def user_required():
         @wraps(fn)
         def wrapper(*args, **kwargs):
             current_user = get_current_user()
-            if current_user.get('role') not in ['CUSTOMER', 'ADMIN']:
+            if current_user.get('role') not in USER_ROLES:
                 return jsonify({'error': 'User access required'}), 403
             return fn(*args, **kwargs)
         return wrapper
     return decorator
 
 
+# =============================================================================
+# PASSWORD HELPERS
+# =============================================================================
+def hash_password(password):
+    """Hash a password with the configured argon2id parameters."""
+    return password_hasher.hash(password)
+
+
+def check_hash(stored_hash, password):
+    """
+    Check a password against an argon2 hash, or against a Werkzeug hash
+    written before the switch to argon2.
+    """
+    if stored_hash.startswith('$argon2'):
+        try:
+            return password_hasher.verify(stored_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return check_password_hash(stored_hash, password)
+
+
+def needs_rehash(stored_hash):
+    """True for Werkzeug hashes and argon2 hashes made with other parameters."""
+    return not stored_hash.startswith('$argon2') or password_hasher.check_needs_rehash(stored_hash)
+
+
+def rehash_password(user_id, old_hash, password):
+    """
+    Replace a verified legacy hash with one made by hash_password. Only the hash
+    that was verified is replaced, and a failure here never fails the login.
+    """
+    try:
+        new_hash = hash_password(password)
+        with get_db_connection(write=True) as conn:
+            conn.execute(
+                'UPDATE Users SET password_hash = ? WHERE user_id = ? AND password_hash = ?',
+                (new_hash, user_id, old_hash)
+            )
+    except Exception as e:
+        app.logger.warning('Could not rehash password for user %s: %s', user_id, e)
+
+
+# blake2b(stored hash, password) of recent failed checks, so repeating a wrong
+# password is rejected without another full hash. Keying on the stored hash
+# means a password change can never be shadowed by an old entry.
+failed_password_cache = TTLCache(maxsize=10000, ttl=60)
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash():
+    """
+    Hash compared against when no user row matches, so a miss costs the same
+    as a hit. Built on first use rather than at import, once per process.
+    """
+    return hash_password('tessera-dummy-password')
+
+
+def verify_password(account, user, password):
+    """
+    Check a password against a user row's hash. Always performs one hash check,
+    even when user is None, so response time does not reveal whether it exists.
+    account is the username or user_id the client submitted; a recently failed
+    (account, password) pair is rejected without rehashing, for missing and
+    existing users alike, and a miss for one account never warms another.
+    """
+    stored_hash = user['password_hash'] if user else _dummy_hash()
+    key = hashlib.blake2b(
+        f'{account}\0{stored_hash}\0{password}'.encode(), digest_size=16
+    ).digest()
+    if failed_password_cache.get(key):
+        return False
+
+    password_ok = check_hash(stored_hash, password)
+    if user is None or not password_ok:
+        failed_password_cache.set(key, True)
+        return False
+    return True
+
+
 # =============================================================================
 # AUTHENTICATION ENDPOINTS
 # =============================================================================
@@ -145,27 +1044,24 @@ def create_user():
     Create a new user account.
     Expected JSON: { "email": "...", "username": "...", "password": "..." }
     """
-    email = request.json.get('email')
-    username = request.json.get('username')
-    password = request.json.get('password')
+    data = request.get_json(silent=True) or {}
+    email = data.get('email')
+    username = data.get('username')
+    password = data.get('password')
 
     if not email or not username or not password:
         return jsonify({'error': 'All fields (email, username, and password) are required.'}), 400
 
-    hashed_password = generate_password_hash(password)
+    hashed_password = hash_password(password)
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            'INSERT INTO Users (email, username, password_hash, role) VALUES (?, ?, ?, ?)',
-            (email, username, hashed_password, 'CUSTOMER')
-        )
-        conn.commit()
-        cursor.execute('SELECT user_id FROM Users WHERE username = ?', (username,))
-        new_user_id = cursor.fetchone()
-        conn.close()
-        return jsonify({'message': 'User created successfully', 'user_id': new_user_id['user_id']}), 201
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'INSERT INTO Users (email, username, password_hash, role) VALUES (?, ?, ?, ?)',
+                (email, username, hashed_password, 'CUSTOMER')
+            )
+            return jsonify({'message': 'User created successfully', 'user_id': cursor.lastrowid}), 201
     except sqlite3.IntegrityError:
         return jsonify({'error': 'Username or email already exists.'}), 409
     except Exception as e:
@@ -173,27 +1069,28 @@ def create_user():
 
 
 @app.route('/login', methods=['POST'])
+@limiter.limit(PASSWORD_RATE_LIMIT)
 def login():
     """
     Login endpoint that validates username/password and returns JWT tokens.
     Returns both access_token (short-lived) and refresh_token (long-lived).
     """
-    username = request.json.get('username')
-    password = request.json.get('password')
+    data = request.get_json(silent=True) or {}
+    username = data.get('username')
+    password = data.get('password')
 
     if not username or not password:
         return jsonify({'error': 'Username and password are required'}), 400
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        'SELECT user_id, username, email, password_hash, role FROM Users WHERE username = ?',
-        (username,)
-    )
-    user = cursor.fetchone()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SQL_LOGIN, (username,))
+        user = cursor.fetchone()
+
+    if verify_password(username, user, password):
+        if needs_rehash(user['password_hash']):
+            rehash_password(user['user_id'], user['password_hash'], password)
 
-    if user and check_password_hash(user['password_hash'], password):
         user_identity = {
             'user_id': user['user_id'],
             'username': user['username'],
@@ -248,115 +1145,122 @@ def get_me():
 # USER MANAGEMENT ENDPOINTS
 # =============================================================================
 @app.route('/change_password', methods=['PUT'])
+@limiter.limit(PASSWORD_RATE_LIMIT)
 @jwt_required()
 def change_password():
     """Change a user's password. Requires current password for verification."""
     current_user = get_current_user()
     user_id = current_user['user_id']
     
-    current_password = request.json.get('current_password')
-    new_password = request.json.get('new_password')
+    data = request.get_json(silent=True) or {}
+    current_password = data.get('current_password')
+    new_password = data.get('new_password')
 
     if not current_password or not new_password:
         return jsonify({'error': 'current_password and new_password are required'}), 400
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT password_hash FROM Users WHERE user_id = ?', (user_id,))
-    user = cursor.fetchone()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SQL_USER_PASSWORD_HASH, (user_id,))
+        user = cursor.fetchone()
+
+    password_ok = verify_password(user_id, user, current_password)
 
     if not user:
-        conn.close()
         return jsonify({'error': 'User not found'}), 404
 
-    if not check_password_hash(user['password_hash'], current_password):
-        conn.close()
+    if not password_ok:
         return jsonify({'error': 'Current password is incorrect'}), 401
 
     try:
-        new_hash = generate_password_hash(new_password)
-        cursor.execute('UPDATE Users SET password_hash = ? WHERE user_id = ?', (new_hash, user_id))
-        conn.commit()
-        conn.close()
-        return jsonify({'message': 'Password updated successfully'}), 200
+        new_hash = hash_password(new_password)
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            # Only replace the hash that was just verified, so a concurrent change is not overwritten
+            cursor.execute(
+                'UPDATE Users SET password_hash = ? WHERE user_id = ? AND password_hash = ?',
+                (new_hash, user_id, user['password_hash'])
+            )
+            if cursor.rowcount == 0:
+                return jsonify({'error': 'Password was changed by another request, please retry'}), 409
+            return jsonify({'message': 'Password updated successfully'}), 200
     except Exception as e:
-        conn.close()
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/change_username_email', methods=['POST'])
+@limiter.limit(PASSWORD_RATE_LIMIT)
 @jwt_required()
 def change_username_email():
     """Change a user's username and email after verifying their password."""
     current_user = get_current_user()
     user_id = current_user['user_id']
     
-    new_username = request.json.get('new_username')
-    new_email = request.json.get('new_email')
-    password = request.json.get('password')
+    data = request.get_json(silent=True) or {}
+    new_username = data.get('new_username')
+    new_email = data.get('new_email')
+    password = data.get('password')
 
     if not new_username or not new_email or not password:
         return jsonify({'error': 'new_username, new_email, and password are required'}), 400
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT password_hash FROM Users WHERE user_id = ?', (user_id,))
-    user = cursor.fetchone()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SQL_USER_PASSWORD_HASH, (user_id,))
+        user = cursor.fetchone()
 
-    if user and check_password_hash(user['password_hash'], password):
-        try:
-            conn = get_db_connection()
+    # Verified before checking out the writer, so other writes never wait on hashing
+    if not verify_password(user_id, user, password):
+        return jsonify({'error': 'Invalid user ID or password'}), 401
+
+    try:
+        with get_db_connection(write=True) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 'UPDATE Users SET username = ?, email = ? WHERE user_id = ?',
                 (new_username, new_email, user_id)
             )
-            conn.commit()
-            conn.close()
             return jsonify({'message': 'Username and email updated successfully'}), 200
-        except sqlite3.IntegrityError:
-            return jsonify({'error': 'Username or email already exists.'}), 409
-        except Exception as e:
-            return jsonify({'error': str(e)}), 500
-    else:
-        return jsonify({'error': 'Invalid user ID or password'}), 401
+    except sqlite3.IntegrityError:
+        return jsonify({'error': 'Username or email already exists.'}), 409
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 
 @app.route('/user', methods=['DELETE'])
+@limiter.limit(PASSWORD_RATE_LIMIT)
 @jwt_required()
 def delete_user():
     """Delete a user account and any related data. Requires password verification."""
     current_user = get_current_user()
     user_id = current_user['user_id']
     
-    password = request.json.get('password')
+    data = request.get_json(silent=True) or {}
+    password = data.get('password')
 
     if not password:
         return jsonify({'error': 'password is required'}), 400
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT password_hash FROM Users WHERE user_id = ?', (user_id,))
-    user = cursor.fetchone()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SQL_USER_PASSWORD_HASH, (user_id,))
+        user = cursor.fetchone()
+
+    password_ok = verify_password(user_id, user, password)
 
     if not user:
-        conn.close()
         return jsonify({'error': 'User not found'}), 404
 
-    if not check_password_hash(user['password_hash'], password):
-        conn.close()
+    if not password_ok:
         return jsonify({'error': 'Invalid password'}), 401
 
     try:
-        cursor.execute('DELETE FROM Carts WHERE user_id = ?', (user_id,))
-        cursor.execute('DELETE FROM Orders WHERE user_id = ?', (user_id,))
-        cursor.execute('DELETE FROM Users WHERE user_id = ?', (user_id,))
-        conn.commit()
-        conn.close()
-        return jsonify({'message': 'User and associated data deleted'}), 200
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            # Carts and Orders (and their seats, items and tickets) cascade from Users
+            cursor.execute('DELETE FROM Users WHERE user_id = ?', (user_id,))
+            return jsonify({'message': 'User and associated data deleted'}), 200
     except Exception as e:
-        conn.close()
         return jsonify({'error': str(e)}), 500
 
 
@@ -364,61 +1268,57 @@ def delete_user():
 # VENUE ENDPOINTS
 # =============================================================================
 @app.route('/venues', methods=['GET'])
+@cached_response(venues_cache)
 def get_venues():
     """Get all venues."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM Venues')
-        venues = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return jsonify({'venues': venues}), 200
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_VENUES)
+            venues = cursor.fetchall()
+            return jsonify({'venues': venues}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/venues', methods=['POST'])
-@jwt_required()
 @admin_required()
 def create_venue():
     """Create a new venue. Requires admin authentication."""
-    venue_name = request.json.get('venue_name')
-    city = request.json.get('city')
-    state = request.json.get('state', '')
-    country = request.json.get('country')
-    timezone = request.json.get('timezone')
+    data = request.get_json(silent=True) or {}
+    venue_name = data.get('venue_name')
+    city = data.get('city')
+    state = data.get('state', '')
+    country = data.get('country')
+    timezone = data.get('timezone')
 
     if not venue_name or not city or not country or not timezone:
         return jsonify({'error': 'venue_name, city, country, and timezone are required'}), 400
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            'INSERT INTO Venues (venue_name, city, state, country, timezone) VALUES (?, ?, ?, ?, ?)',
-            (venue_name, city, state, country, timezone)
-        )
-        conn.commit()
-        venue_id = cursor.lastrowid
-        conn.close()
-        return jsonify({'message': 'Venue created', 'venue_id': venue_id}), 201
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'INSERT INTO Venues (venue_name, city, state, country, timezone) VALUES (?, ?, ?, ?, ?)',
+                (venue_name, city, state, country, timezone)
+            )
+            venues_cache.clear()
+            venue_id = cursor.lastrowid
+            return jsonify({'message': 'Venue created', 'venue_id': venue_id}), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/venues/<int:venue_id>/seats', methods=['GET'])
+@cached_response(venues_cache)
 def get_venue_seats(venue_id):
     """Get all seats for a venue."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            'SELECT * FROM Seats WHERE venue_id = ? ORDER BY row_label, col_index',
-            (venue_id,)
-        )
-        seats = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return jsonify({'seats': seats}), 200
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_VENUE_SEATS, (venue_id, *page_args()))
+            seats = cursor.fetchall()
+            return jsonify({'seats': seats}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -426,225 +1326,192 @@ def get_venue_seats(venue_id):
 # =============================================================================
 # EVENT ENDPOINTS
 # =============================================================================
+# Ordered for error messages; membership checks use the frozenset
+EVENT_STATUSES = ('SCHEDULED', 'ON_SALE', 'CANCELLED', 'COMPLETED')
+VALID_EVENT_STATUSES = frozenset(EVENT_STATUSES)
+
+
 @app.route('/events', methods=['GET'])
+@cached_response(events_cache)
 def get_events():
-    """Get all events with optional date filter."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    query = '''
-        SELECT e.*, v.venue_name, v.city, v.state, v.country
-        FROM Events e
-        LEFT JOIN Venues v ON e.venue_id = v.venue_id
-    '''
-    params = []
-    
+    """Get all events with optional date filter and ?page=&page_size= paging."""
     after_date = request.args.get('afterDate')
-    if after_date:
-        query += ' WHERE e.start_datetime > ?'
-        params.append(after_date)
+    limit, offset = page_args()
     
-    cursor.execute(query, params)
-    events = [dict(event) for event in cursor.fetchall()]
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        if after_date:
+            cursor.execute(SQL_EVENTS_AFTER_JSON, (after_date, limit, offset))
+        else:
+            cursor.execute(SQL_EVENTS_JSON, (limit, offset))
+        body = cursor.fetchone()[0]
     
-    return jsonify(events)
+    return app.response_class(body, mimetype='application/json')
 
 
 @app.route('/events/<int:event_id>', methods=['GET'])
+@cached_response(events_cache)
 def get_event(event_id):
     """Get a single event by ID with venue information."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT e.*, v.venue_name, v.city, v.state, v.country
-            FROM Events e
-            LEFT JOIN Venues v ON e.venue_id = v.venue_id
-            WHERE e.event_id = ?
-        ''', (event_id,))
-        event = cursor.fetchone()
-        conn.close()
-        
-        if not event:
-            return jsonify({'error': 'Event not found'}), 404
-        
-        return jsonify(dict(event)), 200
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_EVENT, (event_id,))
+            event = cursor.fetchone()
+        
+            if not event:
+                return jsonify({'error': 'Event not found'}), 404
+        
+            return jsonify(dict(event)), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/events', methods=['POST'])
-@jwt_required()
 @admin_required()
 def create_event():
     """Create a new event. Requires admin authentication."""
-    venue_id = request.json.get('venue_id')
-    event_name = request.json.get('event_name')
-    start_datetime = request.json.get('start_datetime')
-    event_description = request.json.get('event_description', '')
-    image_url = request.json.get('image_url', '')
-    status = request.json.get('status', 'SCHEDULED')
+    data = request.get_json(silent=True) or {}
+    venue_id = data.get('venue_id')
+    event_name = data.get('event_name')
+    start_datetime = data.get('start_datetime')
+    event_description = data.get('event_description', '')
+    image_url = data.get('image_url', '')
+    status = data.get('status', 'SCHEDULED')
 
     if not venue_id or not event_name or not start_datetime:
         return jsonify({'error': 'venue_id, event_name, and start_datetime are required'}), 400
 
-    valid_statuses = ['SCHEDULED', 'ON_SALE', 'CANCELLED', 'COMPLETED']
-    if status not in valid_statuses:
-        return jsonify({'error': f'status must be one of: {valid_statuses}'}), 400
+    if status not in VALID_EVENT_STATUSES:
+        return jsonify({'error': f'status must be one of: {list(EVENT_STATUSES)}'}), 400
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO Events (venue_id, event_name, event_description, start_datetime, image_url, status) 
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (venue_id, event_name, event_description, start_datetime, image_url, status))
-        conn.commit()
-        event_id = cursor.lastrowid
-        conn.close()
-        return jsonify({'message': 'Event created', 'event_id': event_id}), 201
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            # Checked up front so an unknown venue is a 404, not a foreign key error
+            cursor.execute(SQL_VENUE_EXISTS, (venue_id,))
+            if not cursor.fetchone():
+                return jsonify({'error': 'Venue not found'}), 404
+            cursor.execute('''
+                INSERT INTO Events (venue_id, event_name, event_description, start_datetime, image_url, status) 
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (venue_id, event_name, event_description, start_datetime, image_url, status))
+            events_cache.clear()
+            event_id = cursor.lastrowid
+            return jsonify({'message': 'Event created', 'event_id': event_id}), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/events', methods=['PATCH'])
-@jwt_required()
 @admin_required()
 def update_event():
     """Update event details. Requires admin authentication."""
-    event_id = request.json.get('event_id')
-    event_name = request.json.get('event_name')
-    start_datetime = request.json.get('start_datetime')
-    event_description = request.json.get('event_description')
-    image_url = request.json.get('image_url')
-    status = request.json.get('status')
-    venue_id = request.json.get('venue_id')
-
-    if status:
-        valid_statuses = ['SCHEDULED', 'ON_SALE', 'CANCELLED', 'COMPLETED']
-        if status not in valid_statuses:
-            return jsonify({'error': f'status must be one of: {valid_statuses}'}), 400
+    data = request.get_json(silent=True) or {}
+    event_id = data.get('event_id')
+    event_name = data.get('event_name')
+    start_datetime = data.get('start_datetime')
+    event_description = data.get('event_description')
+    image_url = data.get('image_url')
+    status = data.get('status')
+    venue_id = data.get('venue_id')
+
+    if status and status not in VALID_EVENT_STATUSES:
+        return jsonify({'error': f'status must be one of: {list(EVENT_STATUSES)}'}), 400
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE Events
-            SET event_name = ?, start_datetime = ?, event_description = ?, image_url = ?, status = ?, venue_id = ?
-            WHERE event_id = ?
-        ''', (event_name, start_datetime, event_description, image_url, status, venue_id, event_id))
-        conn.commit()
-        conn.close()
-        return jsonify({'message': 'Event updated successfully'}), 200
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            if venue_id is not None:
+                # Checked up front so an unknown venue is a 404, not a foreign key error
+                cursor.execute(SQL_VENUE_EXISTS, (venue_id,))
+                if not cursor.fetchone():
+                    return jsonify({'error': 'Venue not found'}), 404
+            cursor.execute('''
+                UPDATE Events
+                SET event_name = ?, start_datetime = ?, event_description = ?, image_url = ?, status = ?, venue_id = ?
+                WHERE event_id = ?
+            ''', (event_name, start_datetime, event_description, image_url, status, venue_id, event_id))
+            events_cache.clear()
+            inventory_cache.clear()
+            seat_map_cache.clear()
+            invalidate_pricing(event_id)
+            event_meta_cache.pop(event_id)
+            return jsonify({'message': 'Event updated successfully'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/events/image', methods=['GET'])
+@cached_response(events_cache)
 def get_event_image():
     """Get the image URL for a specific event by event_id."""
     event_id = request.args.get('event_id')
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT image_url FROM Events WHERE event_id = ?', (event_id,))
-        row = cursor.fetchone()
-        if row and row['image_url']:
-            return jsonify({'image_url': row['image_url']}), 200
-        else:
-            return jsonify({'error': 'Image URL not found for the given event_id'}), 404
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT image_url FROM Events WHERE event_id = ?', (event_id,))
+            row = cursor.fetchone()
+            if row and row['image_url']:
+                return jsonify({'image_url': row['image_url']}), 200
+            else:
+                return jsonify({'error': 'Image URL not found for the given event_id'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
 
 
 # =============================================================================
 # SEAT & INVENTORY ENDPOINTS
 # =============================================================================
 @app.route('/events/<int:event_id>/seats', methods=['GET'])
+@cached_response(seat_map_cache)
 def get_event_seats(event_id):
     """Get all seats for an event with availability status and pricing."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
         
-        cursor.execute('SELECT venue_id FROM Events WHERE event_id = ?', (event_id,))
-        event = cursor.fetchone()
-        if not event:
-            conn.close()
-            return jsonify({'error': 'Event not found'}), 404
-        
-        cursor.execute('''
-            SELECT s.*, 
-                   COALESCE(ess.status, 'AVAILABLE') as availability,
-                   pt.price_cents,
-                   pt.tier_name
-            FROM Seats s
-            LEFT JOIN EventSeatStatus ess ON s.seat_id = ess.seat_id AND ess.event_id = ?
-            LEFT JOIN SectionPricing sp ON s.section = sp.section AND sp.event_id = ?
-            LEFT JOIN PriceTiers pt ON sp.price_tier_id = pt.price_tier_id
-            WHERE s.venue_id = ?
-            ORDER BY s.row_label, s.col_index
-        ''', (event_id, event_id, event['venue_id']))
-        seats = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return jsonify({'seats': seats}), 200
+            if not get_event_meta(cursor, event_id):
+                return jsonify({'error': 'Event not found'}), 404
+        
+            # EventSeatView is kept current by triggers (see init_db.py)
+            cursor.execute(SQL_EVENT_SEATS, (event_id,))
+            seats = cursor.fetchall()
+            return jsonify({'seats': seats}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/events/<int:event_id>/inventory', methods=['GET'])
+@cached_response(inventory_cache)
 def get_event_inventory(event_id):
     """
     Get seat inventory/availability summary for an event.
     PUBLIC endpoint - does NOT expose who owns seats.
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
         
-        cursor.execute('SELECT venue_id, status FROM Events WHERE event_id = ?', (event_id,))
-        event = cursor.fetchone()
-        if not event:
-            conn.close()
-            return jsonify({'error': 'Event not found'}), 404
-        
-        cursor.execute('''
-            SELECT 
-                s.section,
-                COUNT(*) as total_seats,
-                SUM(CASE WHEN COALESCE(ess.status, 'AVAILABLE') = 'AVAILABLE' THEN 1 ELSE 0 END) as available,
-                SUM(CASE WHEN ess.status = 'HELD' THEN 1 ELSE 0 END) as held,
-                SUM(CASE WHEN ess.status = 'SOLD' THEN 1 ELSE 0 END) as sold,
-                pt.price_cents,
-                pt.tier_name
-            FROM Seats s
-            LEFT JOIN EventSeatStatus ess ON s.seat_id = ess.seat_id AND ess.event_id = ?
-            LEFT JOIN SectionPricing sp ON s.section = sp.section AND sp.event_id = ?
-            LEFT JOIN PriceTiers pt ON sp.price_tier_id = pt.price_tier_id
-            WHERE s.venue_id = ?
-            GROUP BY s.section
-        ''', (event_id, event_id, event['venue_id']))
-        
-        sections = [dict(row) for row in cursor.fetchall()]
-        totals = {
-            'total_seats': sum(s['total_seats'] for s in sections),
-            'available': sum(s['available'] for s in sections),
-            'held': sum(s['held'] for s in sections),
-            'sold': sum(s['sold'] for s in sections)
-        }
+            event = get_event_meta(cursor, event_id)
+            if not event:
+                return jsonify({'error': 'Event not found'}), 404
         
-        conn.close()
-        return jsonify({
-            'event_id': event_id,
-            'event_status': event['status'],
-            'sections': sections,
-            'totals': totals
-        }), 200
+            # EventInventorySummary is kept current by triggers (see init_db.py)
+            cursor.execute(SQL_EVENT_INVENTORY, (event_id,))
+        
+            sections = fetch_dicts(cursor)
+            total_row = sections.pop()
+            totals = {key: int(total_row[key]) for key in ('total_seats', 'available', 'held', 'sold')}
+            for section in sections:
+                del section['is_total']
+        
+            return jsonify({
+                'event_id': event_id,
+                'event_status': event['status'],
+                'sections': sections,
+                'totals': totals
+            }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -652,6 +1519,36 @@ def get_event_inventory(event_id):
 # =============================================================================
 # CART & RESERVATION ENDPOINTS
 # =============================================================================
+def epoch_ms():
+    """Current time as integer unix milliseconds, the unit of Carts.expires_at_epoch."""
+    return int(time.time() * 1000)
+
+
+def seats_held_by_cart(cursor, event_id, cart_id, seat_ids):
+    """Return the subset of seat_ids currently HELD by cart_id, in one query."""
+    cursor.execute(SQL_SEATS_HELD_BY_CART, (event_id, cart_id, json_array(seat_ids)))
+    return {row['seat_id'] for row in cursor.fetchall()}
+
+
+def first_unheld_seat(cursor, event_id, cart_id, seats):
+    """Return the first of a cart's seat rows it no longer holds, or None."""
+    held = seats_held_by_cart(cursor, event_id, cart_id, [seat['seat_id'] for seat in seats])
+    return next((seat for seat in seats if seat['seat_id'] not in held), None)
+
+
+def load_open_cart(cursor, cart_id, user_id):
+    """
+    Return (cart, seats) for a user's OPEN cart in one query, or (None, []).
+    cart has cart_id, event_id, expires_at_epoch, event_name; each seat row has
+    seat_id, section, row_label, seat_number.
+    """
+    cursor.execute(SQL_OPEN_CART, (cart_id, user_id))
+    rows = cursor.fetchall()
+    if not rows:
+        return None, []
+    return rows[0], [row for row in rows if row['seat_id'] is not None]
+
+
 @app.route('/cart', methods=['GET'])
 @jwt_required()
 def get_cart():
@@ -660,38 +1557,29 @@ def get_cart():
     user_id = current_user['user_id']
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT c.*, e.event_name, e.start_datetime, e.image_url, v.venue_name
-            FROM Carts c
-            JOIN Events e ON c.event_id = e.event_id
-            LEFT JOIN Venues v ON e.venue_id = v.venue_id
-            WHERE c.user_id = ? AND c.status = 'OPEN'
-            ORDER BY c.created_at DESC
-        ''', (user_id,))
-        carts = cursor.fetchall()
-        
-        result = []
-        for cart in carts:
-            cart_dict = dict(cart)
-            cursor.execute('''
-                SELECT s.seat_id, s.row_label, s.seat_number, s.section,
-                       pt.price_cents, pt.tier_name
-                FROM CartSeats cs
-                JOIN Seats s ON cs.seat_id = s.seat_id
-                LEFT JOIN SectionPricing sp ON s.section = sp.section AND sp.event_id = ?
-                LEFT JOIN PriceTiers pt ON sp.price_tier_id = pt.price_tier_id
-                WHERE cs.cart_id = ?
-            ''', (cart['event_id'], cart['cart_id']))
-            seats = [dict(s) for s in cursor.fetchall()]
-            cart_dict['seats'] = seats
-            cart_dict['total_cents'] = sum(s['price_cents'] or 0 for s in seats)
-            result.append(cart_dict)
-        
-        conn.close()
-        return jsonify({'carts': result}), 200
+            cursor.execute(SQL_USER_OPEN_CARTS, (user_id,))
+            carts = fetch_dicts(cursor)
+            if not carts:
+                return jsonify({'carts': []}), 200
+        
+            # Seats for all of the user's open carts in one query, grouped by cart
+            cursor.execute(SQL_USER_OPEN_CART_SEATS, (user_id,))
+            seats_by_cart = defaultdict(list)
+            for seat in fetch_dicts(cursor):
+                seats_by_cart[seat.pop('cart_id')].append(seat)
+        
+            for cart in carts:
+                seats = seats_by_cart[cart['cart_id']]
+                pricing = get_pricing(cursor, cart['event_id'], [s['section'] for s in seats])
+                for seat in seats:
+                    seat['price_cents'], seat['tier_name'] = pricing[seat['section']]
+                cart['seats'] = seats
+                cart['total_cents'] = sum(s['price_cents'] or 0 for s in seats)
+        
+            return jsonify({'carts': carts}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -709,135 +1597,122 @@ def reserve_seats(event_id):
     current_user = get_current_user()
     user_id = current_user['user_id']
     
-    seat_ids = request.json.get('seat_ids', [])
-    sections_request = request.json.get('sections', {})
+    data = request.get_json(silent=True) or {}
+    seat_ids = data.get('seat_ids', [])
+    sections_request = data.get('sections', {})
     HOLD_DURATION_MINUTES = 10
+
+    if not is_id_list(seat_ids):
+        return jsonify({'error': 'seat_ids must be a list of seat ids'}), 400
+    if not isinstance(sections_request, dict) or not all(is_int(qty) for qty in sections_request.values()):
+        return jsonify({'error': 'sections must map section names to seat counts'}), 400
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Verify event exists and is on sale
-        cursor.execute('SELECT status, venue_id FROM Events WHERE event_id = ?', (event_id,))
-        event = cursor.fetchone()
-        if not event:
-            conn.close()
-            return jsonify({'error': 'Event not found'}), 404
-        if event['status'] not in ['ON_SALE', 'SCHEDULED']:
-            conn.close()
-            return jsonify({'error': 'Event is not available for ticket sales'}), 400
-        
-        # If sections are provided, find available seats by section
-        if sections_request and not seat_ids:
-            for section_name, qty in sections_request.items():
-                if qty <= 0:
-                    continue
-                cursor.execute('''
-                    SELECT s.seat_id 
-                    FROM Seats s
-                    LEFT JOIN EventSeatStatus ess ON s.seat_id = ess.seat_id AND ess.event_id = ?
-                    WHERE s.venue_id = ? AND s.section = ? 
-                      AND COALESCE(ess.status, 'AVAILABLE') = 'AVAILABLE'
-                    LIMIT ?
-                ''', (event_id, event['venue_id'], section_name, int(qty)))
-                available = [row['seat_id'] for row in cursor.fetchall()]
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            with immediate_transaction(conn):
+                # Verify event exists and is on sale
+                event = get_event_meta(cursor, event_id, fresh=True)
+                if not event:
+                    return jsonify({'error': 'Event not found'}), 404
+                if event['status'] not in ['ON_SALE', 'SCHEDULED']:
+                    return jsonify({'error': 'Event is not available for ticket sales'}), 400
+        
+                # If sections are provided, find available seats by section
+                picked_by_section = bool(sections_request and not seat_ids)
+                if picked_by_section:
+                    for section_name, qty in sections_request.items():
+                        if qty <= 0:
+                            continue
+                        cursor.execute(
+                            SQL_AVAILABLE_SECTION_SEATS, (event['venue_id'], section_name, event_id, int(qty))
+                        )
+                        available = [row['seat_id'] for row in cursor.fetchall()]
                 
-                if len(available) < qty:
-                    conn.close()
-                    return jsonify({
-                        'error': f'Not enough available seats in {section_name}',
-                        'requested': qty,
-                        'available': len(available)
-                    }), 409
-                seat_ids.extend(available)
-        
-        if not seat_ids:
-            conn.close()
-            return jsonify({'error': 'No seats specified for reservation'}), 400
+                        if len(available) < qty:
+                            return jsonify({
+                                'error': f'Not enough available seats in {section_name}',
+                                'requested': qty,
+                                'available': len(available)
+                            }), 409
+                        seat_ids.extend(available)
+        
+                if not seat_ids:
+                    return jsonify({'error': 'No seats specified for reservation'}), 400
+        
+                seat_ids_json = json_array(seat_ids)
+                # Seats picked by section were found available inside this same
+                # transaction, so only explicitly requested seats are re-checked
+                if not picked_by_section:
+                    cursor.execute(SQL_VENUE_SEAT_SECTIONS, (event['venue_id'], seat_ids_json))
+                    venue_seats = {row['seat_id'] for row in cursor.fetchall()}
+                    missing = [seat_id for seat_id in seat_ids if seat_id not in venue_seats]
+                    if missing:
+                        return jsonify({'error': f'Seat {missing[0]} not found'}), 404
+
+                    # Seats without a status row are available
+                    cursor.execute(SQL_SEAT_STATUSES, (event_id, seat_ids_json))
+                    status_by_seat = {row['seat_id']: row['status'] for row in cursor.fetchall()}
+                    unavailable_seats = [
+                        seat_id for seat_id in seat_ids
+                        if status_by_seat.get(seat_id, 'AVAILABLE') != 'AVAILABLE'
+                    ]
+            
+                    if unavailable_seats:
+                        return jsonify({
+                            'error': 'Some seats are not available',
+                            'unavailable_seat_ids': unavailable_seats
+                        }), 409
+        
+                # Get or create cart for this user and event
+                cursor.execute(SQL_USER_EVENT_OPEN_CART, (user_id, event_id))
+                cart = cursor.fetchone()
+        
+                expires_at_epoch = epoch_ms() + HOLD_DURATION_MINUTES * 60 * 1000
+                expires_at = datetime.utcfromtimestamp(expires_at_epoch / 1000).isoformat()
+        
+                if cart:
+                    cart_id = cart['cart_id']
+                    cursor.execute(SQL_EXTEND_CART, (expires_at, expires_at_epoch, cart_id))
+                else:
+                    cursor.execute(SQL_INSERT_CART, (user_id, event_id, expires_at, expires_at_epoch))
+                    cart_id = cursor.lastrowid
+        
+                # Add seats to cart and update their status
+                cursor.executemany(SQL_INSERT_CART_SEAT, [(cart_id, seat_id) for seat_id in seat_ids])
+                cursor.executemany(
+                    SQL_UPSERT_HELD, [(event_id, seat_id, cart_id, expires_at) for seat_id in seat_ids]
+                )
+        
+                # Fetch detailed seat info for response
+                cursor.execute(SQL_SEAT_DETAILS, (seat_ids_json,))
+                rows = cursor.fetchall()
+                pricing = get_pricing(cursor, event_id, [row['section'] for row in rows])
+        
+                # Rows unpack positionally in SQL_SEAT_DETAILS column order
+                reserved_seats = []
+                for seat_id, row_label, seat_number, section in rows:
+                    price_cents, tier_name = pricing[section]
+                    reserved_seats.append({
+                        'seat_id': seat_id,
+                        'row_name': row_label,
+                        'seat_number': seat_number,
+                        'section': section,
+                        'price': (price_cents or 0) / 100,
+                        'tier_name': tier_name
+                    })
+        
+            invalidate_inventory(event_id)
         
-        # Check if all seats are available
-        unavailable_seats = []
-        for seat_id in seat_ids:
-            cursor.execute('''
-                SELECT status FROM EventSeatStatus 
-                WHERE event_id = ? AND seat_id = ?
-            ''', (event_id, seat_id))
-            status_row = cursor.fetchone()
-            if status_row and status_row['status'] != 'AVAILABLE':
-                unavailable_seats.append(seat_id)
-        
-        if unavailable_seats:
-            conn.close()
             return jsonify({
-                'error': 'Some seats are not available',
-                'unavailable_seat_ids': unavailable_seats
-            }), 409
-        
-        # Get or create cart for this user and event
-        cursor.execute('''
-            SELECT cart_id FROM Carts 
-            WHERE user_id = ? AND event_id = ? AND status = 'OPEN'
-        ''', (user_id, event_id))
-        cart = cursor.fetchone()
-        
-        expires_at = (datetime.utcnow() + timedelta(minutes=HOLD_DURATION_MINUTES)).isoformat()
-        
-        if cart:
-            cart_id = cart['cart_id']
-            cursor.execute('UPDATE Carts SET expires_at = ? WHERE cart_id = ?', (expires_at, cart_id))
-        else:
-            cursor.execute('''
-                INSERT INTO Carts (user_id, event_id, status, expires_at)
-                VALUES (?, ?, 'OPEN', ?)
-            ''', (user_id, event_id, expires_at))
-            cart_id = cursor.lastrowid
-        
-        # Add seats to cart and update their status
-        for seat_id in seat_ids:
-            cursor.execute('INSERT OR IGNORE INTO CartSeats (cart_id, seat_id) VALUES (?, ?)', (cart_id, seat_id))
-            cursor.execute('''
-                INSERT INTO EventSeatStatus (event_id, seat_id, status, held_by_cart_id, hold_expires_at, updated_at)
-                VALUES (?, ?, 'HELD', ?, ?, datetime('now'))
-                ON CONFLICT(event_id, seat_id) DO UPDATE SET
-                    status = 'HELD',
-                    held_by_cart_id = ?,
-                    hold_expires_at = ?,
-                    updated_at = datetime('now')
-            ''', (event_id, seat_id, cart_id, expires_at, cart_id, expires_at))
-        
-        # Fetch detailed seat info for response
-        cursor.execute('''
-            SELECT s.seat_id, s.row_label, s.seat_number, s.section,
-                   pt.price_cents, pt.tier_name
-            FROM Seats s
-            LEFT JOIN SectionPricing sp ON s.section = sp.section AND sp.event_id = ?
-            LEFT JOIN PriceTiers pt ON sp.price_tier_id = pt.price_tier_id
-            WHERE s.seat_id IN ({})
-        '''.format(','.join('?' * len(seat_ids))), [event_id] + seat_ids)
-        
-        reserved_seats = [{
-            'seat_id': row['seat_id'],
-            'row_name': row['row_label'],
-            'seat_number': row['seat_number'],
-            'section': row['section'],
-            'price': (row['price_cents'] or 0) / 100,
-            'tier_name': row['tier_name']
-        } for row in cursor.fetchall()]
-        
-        conn.commit()
-        conn.close()
-        
-        return jsonify({
-            'message': 'Seats reserved successfully',
-            'cart_id': cart_id,
-            'seats_reserved': len(seat_ids),
-            'reserved_seats': reserved_seats,
-            'expires_at': expires_at,
-            'hold_duration_minutes': HOLD_DURATION_MINUTES
-        }), 200
+                'message': 'Seats reserved successfully',
+                'cart_id': cart_id,
+                'seats_reserved': len(seat_ids),
+                'reserved_seats': reserved_seats,
+                'expires_at': expires_at,
+                'hold_duration_minutes': HOLD_DURATION_MINUTES
+            }), 200
     except Exception as e:
-        if conn:
-            conn.close()
         return jsonify({'error': str(e)}), 500
 
 
@@ -851,64 +1726,78 @@ def release_seats(event_id):
     current_user = get_current_user()
     user_id = current_user['user_id']
     
-    seat_ids = request.json.get('seat_ids', [])
+    data = request.get_json(silent=True) or {}
+    seat_ids = data.get('seat_ids', [])
     if not seat_ids:
         return jsonify({'error': 'seat_ids is required'}), 400
+    if not is_id_list(seat_ids):
+        return jsonify({'error': 'seat_ids must be a list of seat ids'}), 400
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            with immediate_transaction(conn):
+                cursor.execute(SQL_USER_EVENT_OPEN_CART, (user_id, event_id))
+                cart = cursor.fetchone()
         
-        cursor.execute('''
-            SELECT cart_id FROM Carts 
-            WHERE user_id = ? AND event_id = ? AND status = 'OPEN'
-        ''', (user_id, event_id))
-        cart = cursor.fetchone()
+                if not cart:
+                    return jsonify({'error': 'No active cart found for this event'}), 404
         
-        if not cart:
-            conn.close()
-            return jsonify({'error': 'No active cart found for this event'}), 404
+                cart_id = cart['cart_id']
         
-        cart_id = cart['cart_id']
-        released_seats = []
+                # Only seats this cart actually holds are released
+                cursor.execute(SQL_SEATS_OWNED_BY_CART, (event_id, cart_id, json_array(seat_ids)))
+                owned = {row['seat_id'] for row in cursor.fetchall()}
+                released_seats = list(dict.fromkeys(seat_id for seat_id in seat_ids if seat_id in owned))
         
-        for seat_id in seat_ids:
-            cursor.execute('''
-                SELECT status, held_by_cart_id FROM EventSeatStatus
-                WHERE event_id = ? AND seat_id = ?
-            ''', (event_id, seat_id))
-            status_row = cursor.fetchone()
-            
-            if status_row and status_row['held_by_cart_id'] == cart_id:
-                cursor.execute('DELETE FROM CartSeats WHERE cart_id = ? AND seat_id = ?', (cart_id, seat_id))
-                cursor.execute('''
-                    UPDATE EventSeatStatus 
-                    SET status = 'AVAILABLE', held_by_cart_id = NULL, hold_expires_at = NULL, updated_at = datetime('now')
-                    WHERE event_id = ? AND seat_id = ?
-                ''', (event_id, seat_id))
-                released_seats.append(seat_id)
-        
-        # If cart is now empty, mark as expired
-        cursor.execute('SELECT COUNT(*) as count FROM CartSeats WHERE cart_id = ?', (cart_id,))
-        if cursor.fetchone()['count'] == 0:
-            cursor.execute('UPDATE Carts SET status = "EXPIRED" WHERE cart_id = ?', (cart_id,))
-        
-        conn.commit()
-        conn.close()
+                if released_seats:
+                    released_json = json_array(released_seats)
+                    cursor.execute(SQL_DELETE_CART_SEATS, (cart_id, released_json))
+                    cursor.execute(SQL_RELEASE_SEATS, (event_id, released_json))
         
-        return jsonify({
-            'message': 'Seats released successfully',
-            'seats_released': released_seats
-        }), 200
+                # If cart is now empty, mark as expired
+                cursor.execute(SQL_EXPIRE_CART_IF_EMPTY, (cart_id, cart_id))
+        
+            invalidate_inventory(event_id)
+        
+            return jsonify({
+                'message': 'Seats released successfully',
+                'seats_released': released_seats
+            }), 200
     except Exception as e:
-        if conn:
-            conn.close()
         return jsonify({'error': str(e)}), 500
 
 
 # =============================================================================
 # CHECKOUT & PAYMENT ENDPOINTS
 # =============================================================================
+def issue_tickets(cursor, order_id, event_id, seat_prices):
+    """
+    Create the OrderItems and ISSUED Tickets for an order from (seat_id, price_cents)
+    pairs and mark those seats SOLD, using one statement per table.
+    Returns {seat_id: (ticket_id, barcode)}.
+    """
+    cursor.execute(SQL_INSERT_ORDER_ITEMS, (order_id, json_array(seat_prices)))
+    order_item_ids = {row['seat_id']: row['order_item_id'] for row in cursor.fetchall()}
+
+    raw = os.urandom(8 * len(seat_prices))
+    barcodes = {
+        seat_id: raw[i * 8:(i + 1) * 8].hex().upper()
+        for i, (seat_id, _) in enumerate(seat_prices)
+    }
+    cursor.execute(SQL_INSERT_TICKETS, (
+        json_array([order_item_ids[seat_id], barcode] for seat_id, barcode in barcodes.items()),
+    ))
+    ticket_ids = {row['order_item_id']: row['ticket_id'] for row in cursor.fetchall()}
+
+    cursor.execute(SQL_MARK_SOLD, (event_id, json_array(barcodes)))
+
+    return {
+        seat_id: (ticket_ids[order_item_ids[seat_id]], barcode)
+        for seat_id, barcode in barcodes.items()
+    }
+
+
 @app.route('/cart/<int:cart_id>/checkout', methods=['POST'])
 @jwt_required()
 def checkout_cart(cart_id):
@@ -920,109 +1809,56 @@ def checkout_cart(cart_id):
     user_id = current_user['user_id']
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            with immediate_transaction(conn):
+                cart, seats = load_open_cart(cursor, cart_id, user_id)
         
-        cursor.execute('''
-            SELECT c.*, e.event_id, e.event_name
-            FROM Carts c
-            JOIN Events e ON c.event_id = e.event_id
-            WHERE c.cart_id = ? AND c.user_id = ? AND c.status = 'OPEN'
-        ''', (cart_id, user_id))
-        cart = cursor.fetchone()
+                if not cart:
+                    return jsonify({'error': 'Cart not found or already processed'}), 404
         
-        if not cart:
-            conn.close()
-            return jsonify({'error': 'Cart not found or already processed'}), 404
+                if cart['expires_at_epoch'] < epoch_ms():
+                    cursor.execute(SQL_EXPIRE_CART, (cart_id,))
+                    return jsonify({'error': 'Cart has expired. Please reserve seats again.'}), 410
         
-        if cart['expires_at'] < datetime.utcnow().isoformat():
-            cursor.execute('UPDATE Carts SET status = "EXPIRED" WHERE cart_id = ?', (cart_id,))
-            conn.commit()
-            conn.close()
-            return jsonify({'error': 'Cart has expired. Please reserve seats again.'}), 410
+                event_id = cart['event_id']
         
-        event_id = cart['event_id']
+                if not seats:
+                    return jsonify({'error': 'Cart is empty'}), 400
         
-        cursor.execute('''
-            SELECT s.seat_id, s.section, pt.price_cents
-            FROM CartSeats cs
-            JOIN Seats s ON cs.seat_id = s.seat_id
-            LEFT JOIN SectionPricing sp ON s.section = sp.section AND sp.event_id = ?
-            LEFT JOIN PriceTiers pt ON sp.price_tier_id = pt.price_tier_id
-            WHERE cs.cart_id = ?
-        ''', (event_id, cart_id))
-        seats = cursor.fetchall()
+                # Verify all seats are still held by this cart
+                unheld = first_unheld_seat(cursor, event_id, cart_id, seats)
+                if unheld:
+                    return jsonify({'error': f'Seat {unheld["seat_id"]} is no longer reserved for you'}), 409
         
-        if not seats:
-            conn.close()
-            return jsonify({'error': 'Cart is empty'}), 400
+                pricing = get_pricing(cursor, event_id, [seat['section'] for seat in seats], fresh=True)
+                seat_prices = [(seat['seat_id'], pricing[seat['section']][0] or 0) for seat in seats]
+                total_cents = sum(price_cents for _, price_cents in seat_prices)
         
-        # Verify all seats are still held by this cart
-        for seat in seats:
-            cursor.execute('''
-                SELECT status, held_by_cart_id FROM EventSeatStatus
-                WHERE event_id = ? AND seat_id = ?
-            ''', (event_id, seat['seat_id']))
-            status = cursor.fetchone()
-            if not status or status['status'] != 'HELD' or status['held_by_cart_id'] != cart_id:
-                conn.close()
-                return jsonify({'error': f'Seat {seat["seat_id"]} is no longer reserved for you'}), 409
-        
-        total_cents = sum(s['price_cents'] or 0 for s in seats)
-        
-        cursor.execute('''
-            INSERT INTO Orders (user_id, event_id, status, total_cents)
-            VALUES (?, ?, 'PAID', ?)
-        ''', (user_id, event_id, total_cents))
-        order_id = cursor.lastrowid
-        
-        tickets_created = []
-        for seat in seats:
-            seat_id = seat['seat_id']
-            price_cents = seat['price_cents'] or 0
-            
-            cursor.execute('''
-                INSERT INTO OrderItems (order_id, seat_id, unit_price_cents, line_total_cents)
-                VALUES (?, ?, ?, ?)
-            ''', (order_id, seat_id, price_cents, price_cents))
-            order_item_id = cursor.lastrowid
-            
-            barcode = str(uuid.uuid4()).replace('-', '')[:16].upper()
-            cursor.execute('''
-                INSERT INTO Tickets (order_item_id, barcode_num, status)
-                VALUES (?, ?, 'ISSUED')
-            ''', (order_item_id, barcode))
-            ticket_id = cursor.lastrowid
-            
-            tickets_created.append({
-                'ticket_id': ticket_id,
-                'seat_id': seat_id,
-                'barcode': barcode,
-                'price_cents': price_cents
-            })
-            
-            cursor.execute('''
-                UPDATE EventSeatStatus 
-                SET status = 'SOLD', held_by_cart_id = NULL, hold_expires_at = NULL, updated_at = datetime('now')
-                WHERE event_id = ? AND seat_id = ?
-            ''', (event_id, seat_id))
+                cursor.execute(SQL_INSERT_ORDER, (user_id, event_id, total_cents))
+                order_id = cursor.lastrowid
         
-        cursor.execute('UPDATE Carts SET status = "CONVERTED" WHERE cart_id = ?', (cart_id,))
-        cursor.execute('DELETE FROM CartSeats WHERE cart_id = ?', (cart_id,))
+                issued = issue_tickets(cursor, order_id, event_id, seat_prices)
+                tickets_created = [{
+                    'ticket_id': issued[seat_id][0],
+                    'seat_id': seat_id,
+                    'barcode': issued[seat_id][1],
+                    'price_cents': price_cents
+                } for seat_id, price_cents in seat_prices]
         
-        conn.commit()
-        conn.close()
+                cursor.execute(SQL_CONVERT_CART, (cart_id,))
+                cursor.execute(SQL_EMPTY_CART, (cart_id,))
         
-        return jsonify({
-            'message': 'Purchase completed successfully',
-            'order_id': order_id,
-            'event_name': cart['event_name'],
-            'total_cents': total_cents,
-            'tickets': tickets_created
-        }), 201
+            invalidate_inventory(event_id)
+        
+            return jsonify({
+                'message': 'Purchase completed successfully',
+                'order_id': order_id,
+                'event_name': cart['event_name'],
+                'total_cents': total_cents,
+                'tickets': tickets_created
+            }), 201
     except Exception as e:
-        if conn:
-            conn.close()
         return jsonify({'error': str(e)}), 500
 
 
@@ -1037,70 +1873,44 @@ def create_payment_intent():
     user_id = current_user['user_id']
     
     try:
-        data = request.json
+        data = request.get_json(silent=True) or {}
         cart_id = data.get('cart_id')
         
         if not cart_id:
             return jsonify({'error': 'cart_id is required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT c.*, e.event_id, e.event_name
-            FROM Carts c
-            JOIN Events e ON c.event_id = e.event_id
-            WHERE c.cart_id = ? AND c.user_id = ? AND c.status = 'OPEN'
-        ''', (cart_id, user_id))
-        cart = cursor.fetchone()
+            cart, seats = load_open_cart(cursor, cart_id, user_id)
         
-        if not cart:
-            conn.close()
-            return jsonify({'error': 'Cart not found or already processed'}), 404
+            if not cart:
+                return jsonify({'error': 'Cart not found or already processed'}), 404
         
-        if cart['expires_at'] < datetime.utcnow().isoformat():
-            cursor.execute('UPDATE Carts SET status = "EXPIRED" WHERE cart_id = ?', (cart_id,))
-            conn.commit()
-            conn.close()
-            return jsonify({'error': 'Cart has expired. Please reserve seats again.'}), 410
-        
-        event_id = cart['event_id']
-        
-        cursor.execute('''
-            SELECT s.seat_id, s.section, s.row_label, s.seat_number, 
-                   COALESCE(pt.price_cents, 0) as price_cents
-            FROM CartSeats cs
-            JOIN Seats s ON cs.seat_id = s.seat_id
-            LEFT JOIN SectionPricing sp ON s.section = sp.section AND sp.event_id = ?
-            LEFT JOIN PriceTiers pt ON sp.price_tier_id = pt.price_tier_id
-            WHERE cs.cart_id = ?
-        ''', (event_id, cart_id))
-        seats = cursor.fetchall()
-        
-        if not seats:
-            conn.close()
-            return jsonify({'error': 'Cart is empty'}), 400
+            if cart['expires_at_epoch'] < epoch_ms():
+                with get_db_connection(write=True) as write_conn:
+                    write_conn.execute(SQL_EXPIRE_CART, (cart_id,))
+                return jsonify({'error': 'Cart has expired. Please reserve seats again.'}), 410
         
-        # Verify all seats are still held by this cart
-        for seat in seats:
-            cursor.execute('''
-                SELECT status, held_by_cart_id FROM EventSeatStatus
-                WHERE event_id = ? AND seat_id = ?
-            ''', (event_id, seat['seat_id']))
-            status = cursor.fetchone()
-            if not status or status['status'] != 'HELD' or status['held_by_cart_id'] != cart_id:
-                conn.close()
-                return jsonify({
-                    'error': f'Seat {seat["row_label"]}{seat["seat_number"]} is no longer reserved for you'
-                }), 409
+            event_id = cart['event_id']
         
-        conn.close()
+            if not seats:
+                return jsonify({'error': 'Cart is empty'}), 400
         
-        total_cents = sum(seat['price_cents'] for seat in seats)
+            # Verify all seats are still held by this cart
+            unheld = first_unheld_seat(cursor, event_id, cart_id, seats)
+            if unheld:
+                return jsonify({
+                    'error': f'Seat {unheld["row_label"]}{unheld["seat_number"]} is no longer reserved for you'
+                }), 409
+
+            pricing = get_pricing(cursor, event_id, [seat['section'] for seat in seats], fresh=True)
         
+        total_cents = sum(pricing[seat['section']][0] or 0 for seat in seats)
+    
         if total_cents <= 0:
             return jsonify({'error': 'Invalid total amount'}), 400
-        
+    
         payment_intent = stripe.PaymentIntent.create(
             amount=total_cents,
             currency='usd',
@@ -1111,7 +1921,7 @@ def create_payment_intent():
                 'seat_count': str(len(seats))
             }
         )
-        
+    
         return jsonify({
             'clientSecret': payment_intent['client_secret'],
             'paymentIntentId': payment_intent['id'],
@@ -1126,6 +1936,30 @@ def create_payment_intent():
         return jsonify({'error': str(e)}), 500
 
 
+# payment_intent_id -> metadata of intents already seen as succeeded. That status
+# is terminal, so a retried /complete-purchase need not ask Stripe again.
+succeeded_intent_cache = TTLCache(maxsize=1024, ttl=600)
+
+
+def retrieve_payment_intent(payment_intent_id):
+    """
+    Return (status, metadata) for a PaymentIntent, where metadata holds the
+    cart_id and user_id set at creation. Succeeded intents are cached.
+    """
+    metadata = succeeded_intent_cache.get(payment_intent_id)
+    if metadata is not None:
+        return 'succeeded', metadata
+
+    payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+    metadata = {
+        'cart_id': payment_intent.metadata.get('cart_id'),
+        'user_id': payment_intent.metadata.get('user_id')
+    }
+    if payment_intent.status == 'succeeded':
+        succeeded_intent_cache.set(payment_intent_id, metadata)
+    return payment_intent.status, metadata
+
+
 @app.route('/complete-purchase', methods=['POST'])
 @jwt_required()
 def complete_purchase():
@@ -1137,7 +1971,7 @@ def complete_purchase():
     user_id = current_user['user_id']
     
     try:
-        data = request.json
+        data = request.get_json(silent=True) or {}
         payment_intent_id = data.get('paymentIntentId')
         cart_id = data.get('cart_id')
         
@@ -1145,129 +1979,76 @@ def complete_purchase():
             return jsonify({'error': 'paymentIntentId and cart_id are required'}), 400
         
         # Verify payment with Stripe
-        payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+        payment_status, metadata = retrieve_payment_intent(payment_intent_id)
         
-        if payment_intent.status != 'succeeded':
+        if payment_status != 'succeeded':
             return jsonify({
                 'error': 'Payment not successful',
-                'payment_status': payment_intent.status
+                'payment_status': payment_status
             }), 400
         
         # Security check - verify metadata matches
-        metadata = payment_intent.metadata
         if metadata.get('cart_id') != str(cart_id) or metadata.get('user_id') != str(user_id):
             return jsonify({'error': 'Payment verification failed - cart mismatch'}), 403
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            with immediate_transaction(conn):
+                cart, seats = load_open_cart(cursor, cart_id, user_id)
         
-        cursor.execute('''
-            SELECT c.*, e.event_id, e.event_name
-            FROM Carts c
-            JOIN Events e ON c.event_id = e.event_id
-            WHERE c.cart_id = ? AND c.user_id = ? AND c.status = 'OPEN'
-        ''', (cart_id, user_id))
-        cart = cursor.fetchone()
+                if not cart:
+                    return jsonify({'error': 'Cart not found or already processed'}), 404
         
-        if not cart:
-            conn.close()
-            return jsonify({'error': 'Cart not found or already processed'}), 404
-        
-        event_id = cart['event_id']
-        
-        cursor.execute('''
-            SELECT s.seat_id, s.section, s.row_label, s.seat_number,
-                   COALESCE(pt.price_cents, 0) as price_cents, pt.tier_name
-            FROM CartSeats cs
-            JOIN Seats s ON cs.seat_id = s.seat_id
-            LEFT JOIN SectionPricing sp ON s.section = sp.section AND sp.event_id = ?
-            LEFT JOIN PriceTiers pt ON sp.price_tier_id = pt.price_tier_id
-            WHERE cs.cart_id = ?
-        ''', (event_id, cart_id))
-        seats = cursor.fetchall()
-        
-        if not seats:
-            conn.close()
-            return jsonify({'error': 'Cart is empty'}), 400
+                event_id = cart['event_id']
         
-        # Verify all seats are still held by this cart
-        for seat in seats:
-            cursor.execute('''
-                SELECT status, held_by_cart_id FROM EventSeatStatus
-                WHERE event_id = ? AND seat_id = ?
-            ''', (event_id, seat['seat_id']))
-            status = cursor.fetchone()
-            if not status or status['status'] != 'HELD' or status['held_by_cart_id'] != cart_id:
-                conn.close()
-                return jsonify({
-                    'error': f'Seat {seat["row_label"]}{seat["seat_number"]} is no longer reserved'
-                }), 409
+                if not seats:
+                    return jsonify({'error': 'Cart is empty'}), 400
         
-        total_cents = sum(seat['price_cents'] for seat in seats)
+                # Verify all seats are still held by this cart
+                unheld = first_unheld_seat(cursor, event_id, cart_id, seats)
+                if unheld:
+                    return jsonify({
+                        'error': f'Seat {unheld["row_label"]}{unheld["seat_number"]} is no longer reserved'
+                    }), 409
         
-        # Create order
-        cursor.execute('''
-            INSERT INTO Orders (user_id, event_id, status, total_cents)
-            VALUES (?, ?, 'PAID', ?)
-        ''', (user_id, event_id, total_cents))
-        order_id = cursor.lastrowid
+                pricing = get_pricing(cursor, event_id, [seat['section'] for seat in seats], fresh=True)
+                price_by_seat = {seat['seat_id']: pricing[seat['section']][0] or 0 for seat in seats}
+                total_cents = sum(price_by_seat.values())
         
-        tickets_created = []
-        for seat in seats:
-            seat_id = seat['seat_id']
-            price_cents = seat['price_cents']
-            
-            cursor.execute('''
-                INSERT INTO OrderItems (order_id, seat_id, unit_price_cents, line_total_cents)
-                VALUES (?, ?, ?, ?)
-            ''', (order_id, seat_id, price_cents, price_cents))
-            order_item_id = cursor.lastrowid
-            
-            barcode = str(uuid.uuid4()).replace('-', '')[:16].upper()
-            cursor.execute('''
-                INSERT INTO Tickets (order_item_id, barcode_num, status)
-                VALUES (?, ?, 'ISSUED')
-            ''', (order_item_id, barcode))
-            ticket_id = cursor.lastrowid
-            
-            tickets_created.append({
-                'ticket_id': ticket_id,
-                'seat_id': seat_id,
-                'row_label': seat['row_label'],
-                'seat_number': seat['seat_number'],
-                'section': seat['section'],
-                'barcode': barcode,
-                'price_cents': price_cents
-            })
-            
-            cursor.execute('''
-                UPDATE EventSeatStatus 
-                SET status = 'SOLD', held_by_cart_id = NULL, hold_expires_at = NULL, updated_at = datetime('now')
-                WHERE event_id = ? AND seat_id = ?
-            ''', (event_id, seat_id))
+                # Create order
+                cursor.execute(SQL_INSERT_ORDER, (user_id, event_id, total_cents))
+                order_id = cursor.lastrowid
         
-        cursor.execute('UPDATE Carts SET status = "CONVERTED" WHERE cart_id = ?', (cart_id,))
-        cursor.execute('DELETE FROM CartSeats WHERE cart_id = ?', (cart_id,))
+                issued = issue_tickets(cursor, order_id, event_id, list(price_by_seat.items()))
+                tickets_created = [{
+                    'ticket_id': issued[seat['seat_id']][0],
+                    'seat_id': seat['seat_id'],
+                    'row_label': seat['row_label'],
+                    'seat_number': seat['seat_number'],
+                    'section': seat['section'],
+                    'barcode': issued[seat['seat_id']][1],
+                    'price_cents': price_by_seat[seat['seat_id']]
+                } for seat in seats]
         
-        conn.commit()
-        conn.close()
+                cursor.execute(SQL_CONVERT_CART, (cart_id,))
+                cursor.execute(SQL_EMPTY_CART, (cart_id,))
         
-        return jsonify({
-            'message': 'Purchase completed successfully',
-            'order_id': order_id,
-            'event_name': cart['event_name'],
-            'event_id': event_id,
-            'total_cents': total_cents,
-            'total_dollars': total_cents / 100,
-            'payment_intent_id': payment_intent_id,
-            'tickets': tickets_created,
-            'ticket_count': len(tickets_created)
-        }), 201
+            invalidate_inventory(event_id)
+        
+            return jsonify({
+                'message': 'Purchase completed successfully',
+                'order_id': order_id,
+                'event_name': cart['event_name'],
+                'event_id': event_id,
+                'total_cents': total_cents,
+                'total_dollars': total_cents / 100,
+                'payment_intent_id': payment_intent_id,
+                'tickets': tickets_created,
+                'ticket_count': len(tickets_created)
+            }), 201
     except stripe.error.StripeError as e:
         return jsonify({'error': f'Stripe error: {str(e)}'}), 400
     except Exception as e:
-        if 'conn' in locals() and conn:
-            conn.close()
         return jsonify({'error': str(e)}), 500
 
 
@@ -1284,124 +2065,108 @@ def create_order():
     current_user = get_current_user()
     user_id = current_user['user_id']
     
-    event_id = request.json.get('event_id')
-    seat_ids = request.json.get('seat_ids', [])
+    data = request.get_json(silent=True) or {}
+    event_id = data.get('event_id')
+    seat_ids = data.get('seat_ids', [])
 
     if not event_id or not seat_ids:
         return jsonify({'error': 'event_id and seat_ids are required'}), 400
+    if not is_int(event_id) or not is_id_list(seat_ids):
+        return jsonify({'error': 'event_id must be an id and seat_ids a list of seat ids'}), 400
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            with immediate_transaction(conn):
+                event = get_event_meta(cursor, event_id, fresh=True)
+                if not event:
+                    return jsonify({'error': 'Event not found'}), 404
+
+                # Calculate total price from seat pricing
+                cursor.execute(SQL_VENUE_SEAT_SECTIONS, (event['venue_id'], json_array(seat_ids)))
+                section_by_seat = {row['seat_id']: row['section'] for row in cursor.fetchall()}
+                pricing = get_pricing(cursor, event_id, section_by_seat.values(), fresh=True)
+                price_by_seat = {
+                    seat_id: pricing[section][0] or 0 for seat_id, section in section_by_seat.items()
+                }
+        
+                missing = [seat_id for seat_id in seat_ids if seat_id not in price_by_seat]
+                if missing:
+                    return jsonify({'error': f'Seat {missing[0]} not found'}), 404
+
+                # Seats without a status row are available; HELD seats belong to
+                # someone's cart and SOLD seats already have a ticket
+                cursor.execute(SQL_SEAT_STATUSES, (event_id, json_array(seat_ids)))
+                status_by_seat = {row['seat_id']: row['status'] for row in cursor.fetchall()}
+                unavailable_seats = [
+                    seat_id for seat_id in seat_ids
+                    if status_by_seat.get(seat_id, 'AVAILABLE') != 'AVAILABLE'
+                ]
+                if unavailable_seats:
+                    return jsonify({
+                        'error': 'Some seats are not available',
+                        'unavailable_seat_ids': unavailable_seats
+                    }), 409
         
-        # Calculate total price from seat pricing
-        total_cents = 0
-        seat_prices = []
-        for seat_id in seat_ids:
-            cursor.execute('SELECT section FROM Seats WHERE seat_id = ?', (seat_id,))
-            seat = cursor.fetchone()
-            if not seat:
-                conn.close()
-                return jsonify({'error': f'Seat {seat_id} not found'}), 404
-            
-            cursor.execute('''
-                SELECT pt.price_cents 
-                FROM SectionPricing sp
-                JOIN PriceTiers pt ON sp.price_tier_id = pt.price_tier_id
-                WHERE sp.event_id = ? AND sp.section = ?
-            ''', (event_id, seat['section']))
-            pricing = cursor.fetchone()
-            price_cents = pricing['price_cents'] if pricing else 0
-            seat_prices.append((seat_id, price_cents))
-            total_cents += price_cents
-        
-        cursor.execute('''
-            INSERT INTO Orders (user_id, event_id, status, total_cents)
-            VALUES (?, ?, 'PAID', ?)
-        ''', (user_id, event_id, total_cents))
-        order_id = cursor.lastrowid
-        
-        tickets_created = []
-        for seat_id, price_cents in seat_prices:
-            cursor.execute('''
-                INSERT INTO OrderItems (order_id, seat_id, unit_price_cents, line_total_cents)
-                VALUES (?, ?, ?, ?)
-            ''', (order_id, seat_id, price_cents, price_cents))
-            order_item_id = cursor.lastrowid
-            
-            barcode = str(uuid.uuid4()).replace('-', '')[:16].upper()
-            cursor.execute('''
-                INSERT INTO Tickets (order_item_id, barcode_num, status)
-                VALUES (?, ?, 'ISSUED')
-            ''', (order_item_id, barcode))
-            ticket_id = cursor.lastrowid
-            
-            tickets_created.append({
-                'ticket_id': ticket_id,
-                'seat_id': seat_id,
-                'barcode': barcode
-            })
-            
-            cursor.execute('''
-                UPDATE EventSeatStatus 
-                SET status = 'SOLD', held_by_cart_id = NULL, hold_expires_at = NULL, updated_at = datetime('now')
-                WHERE event_id = ? AND seat_id = ?
-            ''', (event_id, seat_id))
+                seat_prices = [(seat_id, price_by_seat[seat_id]) for seat_id in seat_ids]
+                total_cents = sum(price_cents for _, price_cents in seat_prices)
         
-        conn.commit()
-        conn.close()
+                cursor.execute(SQL_INSERT_ORDER, (user_id, event_id, total_cents))
+                order_id = cursor.lastrowid
         
-        return jsonify({
-            'message': 'Order created successfully',
-            'order_id': order_id,
-            'total_cents': total_cents,
-            'tickets': tickets_created
-        }), 201
+                issued = issue_tickets(cursor, order_id, event_id, seat_prices)
+                tickets_created = [{
+                    'ticket_id': issued[seat_id][0],
+                    'seat_id': seat_id,
+                    'barcode': issued[seat_id][1]
+                } for seat_id, _ in seat_prices]
+        
+            invalidate_inventory(event_id)
+        
+            return jsonify({
+                'message': 'Order created successfully',
+                'order_id': order_id,
+                'total_cents': total_cents,
+                'tickets': tickets_created
+            }), 201
     except Exception as e:
-        if conn:
-            conn.close()
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/orders', methods=['GET'])
 @jwt_required()
 def get_user_orders():
-    """Get all orders for the current user with their tickets."""
+    """
+    Get the current user's orders with their tickets, newest first. Pass
+    ?limit= for one page and ?before=<next_before> for the page after it.
+    """
     current_user = get_current_user()
     user_id = current_user['user_id']
+    limit = request.args.get('limit', type=int)
+    limit = -1 if limit is None else min(max(limit, 1), MAX_PAGE_SIZE)
+    before = request.args.get('before', NO_CURSOR, type=int)
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT o.*, e.event_name, e.start_datetime, v.venue_name
-            FROM Orders o
-            JOIN Events e ON o.event_id = e.event_id
-            LEFT JOIN Venues v ON e.venue_id = v.venue_id
-            WHERE o.user_id = ?
-            ORDER BY o.created_at DESC
-        ''', (user_id,))
-        orders = cursor.fetchall()
-        
-        result = []
-        for order in orders:
-            order_dict = dict(order)
-            cursor.execute('''
-                SELECT t.ticket_id, t.barcode_num, t.status as ticket_status,
-                       s.row_label, s.seat_number, s.section,
-                       oi.unit_price_cents
-                FROM Tickets t
-                JOIN OrderItems oi ON t.order_item_id = oi.order_item_id
-                JOIN Seats s ON oi.seat_id = s.seat_id
-                WHERE oi.order_id = ?
-            ''', (order['order_id'],))
-            tickets = [dict(t) for t in cursor.fetchall()]
-            order_dict['tickets'] = tickets
-            result.append(order_dict)
-        
-        conn.close()
-        return jsonify({'orders': result}), 200
+            cursor.execute(SQL_USER_ORDERS, (user_id, before, limit))
+            orders = fetch_dicts(cursor)
+            if not orders:
+                return jsonify({'orders': [], 'next_before': None}), 200
+        
+            # Tickets for every order on this page in one query, grouped by order
+            order_ids = [order['order_id'] for order in orders]
+            cursor.execute(SQL_USER_ORDER_TICKETS, (json_array(order_ids),))
+            tickets_by_order = defaultdict(list)
+            for ticket in fetch_dicts(cursor):
+                tickets_by_order[ticket.pop('order_id')].append(ticket)
+        
+            for order in orders:
+                order['tickets'] = tickets_by_order[order['order_id']]
+        
+            next_before = order_ids[-1] if len(orders) == limit else None
+            return jsonify({'orders': orders, 'next_before': next_before}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1417,32 +2182,18 @@ def get_ticket(ticket_id):
     user_id = current_user['user_id']
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT t.*, oi.seat_id, oi.unit_price_cents,
-                   s.row_label, s.seat_number, s.section,
-                   o.order_id, o.user_id, o.event_id,
-                   e.event_name, e.start_datetime,
-                   v.venue_name, v.city
-            FROM Tickets t
-            JOIN OrderItems oi ON t.order_item_id = oi.order_item_id
-            JOIN Orders o ON oi.order_id = o.order_id
-            JOIN Seats s ON oi.seat_id = s.seat_id
-            JOIN Events e ON o.event_id = e.event_id
-            LEFT JOIN Venues v ON e.venue_id = v.venue_id
-            WHERE t.ticket_id = ?
-        ''', (ticket_id,))
-        ticket = cursor.fetchone()
-        conn.close()
+            cursor.execute(SQL_TICKET_DETAIL, (ticket_id,))
+            ticket = cursor.fetchone()
         
         if not ticket:
             return jsonify({'error': 'Ticket not found'}), 404
-        
+    
         if ticket['user_id'] != user_id and current_user.get('role') != 'ADMIN':
             return jsonify({'error': 'Access denied'}), 403
-        
+    
         return jsonify({
             'ticket': {
                 'ticket_id': ticket['ticket_id'],
@@ -1472,24 +2223,21 @@ def get_ticket(ticket_id):
 # ADMIN ENDPOINTS
 # =============================================================================
 @app.route('/emails', methods=['GET'])
-@jwt_required()
 @admin_required()
 def get_all_emails():
     """Return all user emails. Requires admin authentication."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT email FROM Users')
-        rows = cursor.fetchall()
-        conn.close()
-        emails = [row['email'] for row in rows if row['email']]
-        return jsonify({'emails': emails}), 200
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Plain tuple rows: one column, no need for sqlite3.Row per user
+            cursor.row_factory = None
+            emails = [row[0] for row in cursor.execute(SQL_USER_EMAILS)]
+            return jsonify({'emails': emails}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/admin/expired-holds', methods=['POST'])
-@jwt_required()
 @admin_required()
 def cleanup_expired_holds():
     """
@@ -1497,122 +2245,89 @@ def cleanup_expired_holds():
     This would typically be run by a scheduled job.
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        now = datetime.utcnow().isoformat()
-        
-        cursor.execute('''
-            SELECT event_id, seat_id, held_by_cart_id 
-            FROM EventSeatStatus 
-            WHERE status = 'HELD' AND hold_expires_at < ?
-        ''', (now,))
-        expired = cursor.fetchall()
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            with immediate_transaction(conn):
+                now = datetime.utcnow().isoformat()
         
-        released_count = 0
-        cart_ids = set()
+                # The holding carts must be read first: RETURNING only sees the cleared row
+                cursor.execute(SQL_EXPIRED_HOLD_CARTS, (now,))
+                carts = cursor.fetchone()
         
-        for row in expired:
-            cursor.execute('''
-                UPDATE EventSeatStatus 
-                SET status = 'AVAILABLE', held_by_cart_id = NULL, hold_expires_at = NULL, updated_at = datetime('now')
-                WHERE event_id = ? AND seat_id = ?
-            ''', (row['event_id'], row['seat_id']))
-            
-            if row['held_by_cart_id']:
-                cart_ids.add(row['held_by_cart_id'])
-            released_count += 1
+                cursor.execute(SQL_RELEASE_EXPIRED_HOLDS, (now,))
+                released_count = cursor.rowcount
         
-        for cart_id in cart_ids:
-            cursor.execute('UPDATE Carts SET status = "EXPIRED" WHERE cart_id = ? AND status = "OPEN"', (cart_id,))
-            cursor.execute('DELETE FROM CartSeats WHERE cart_id = ?', (cart_id,))
+                if carts['cart_count']:
+                    cursor.execute(SQL_EXPIRE_CARTS, (carts['cart_ids'],))
+                    cursor.execute(SQL_EMPTY_CARTS, (carts['cart_ids'],))
         
-        conn.commit()
-        conn.close()
+            inventory_cache.clear()
+            seat_map_cache.clear()
         
-        return jsonify({
-            'message': 'Expired holds cleaned up',
-            'seats_released': released_count,
-            'carts_expired': len(cart_ids)
-        }), 200
+            return jsonify({
+                'message': 'Expired holds cleaned up',
+                'seats_released': released_count,
+                'carts_expired': carts['cart_count']
+            }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/admin/tickets/<int:ticket_id>/scan', methods=['POST'])
-@jwt_required()
 @admin_required()
 def scan_ticket(ticket_id):
     """Admin endpoint to scan/validate a ticket at entry."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT status FROM Tickets WHERE ticket_id = ?', (ticket_id,))
-        ticket = cursor.fetchone()
-        
-        if not ticket:
-            conn.close()
-            return jsonify({'error': 'Ticket not found'}), 404
-        
-        if ticket['status'] == 'SCANNED':
-            conn.close()
-            return jsonify({'error': 'Ticket has already been scanned'}), 409
-        
-        if ticket['status'] == 'VOIDED':
-            conn.close()
-            return jsonify({'error': 'Ticket has been voided'}), 400
-        
-        cursor.execute('UPDATE Tickets SET status = "SCANNED" WHERE ticket_id = ?', (ticket_id,))
-        conn.commit()
-        conn.close()
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
         
-        return jsonify({'message': 'Ticket scanned successfully', 'ticket_id': ticket_id}), 200
+            with immediate_transaction(conn):
+                cursor.execute(SQL_SCAN_TICKET, (ticket_id,))
+                scanned = cursor.fetchone()
+        
+                # Nothing updated: look up why
+                if not scanned:
+                    cursor.execute(SQL_TICKET_STATUS, (ticket_id,))
+                    ticket = cursor.fetchone()
+                    if not ticket:
+                        return jsonify({'error': 'Ticket not found'}), 404
+                    if ticket['status'] == 'SCANNED':
+                        return jsonify({'error': 'Ticket has already been scanned'}), 409
+                    return jsonify({'error': 'Ticket has been voided'}), 400
+        
+            return jsonify({'message': 'Ticket scanned successfully', 'ticket_id': ticket_id}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/admin/tickets/<int:ticket_id>/void', methods=['POST'])
-@jwt_required()
 @admin_required()
 def void_ticket(ticket_id):
     """Admin endpoint to void a ticket (e.g., for refunds)."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT t.status, oi.seat_id, o.event_id
-            FROM Tickets t
-            JOIN OrderItems oi ON t.order_item_id = oi.order_item_id
-            JOIN Orders o ON oi.order_id = o.order_id
-            WHERE t.ticket_id = ?
-        ''', (ticket_id,))
-        ticket = cursor.fetchone()
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
         
-        if not ticket:
-            conn.close()
-            return jsonify({'error': 'Ticket not found'}), 404
+            with immediate_transaction(conn):
+                cursor.execute(SQL_VOID_TICKET, (ticket_id,))
+                ticket = cursor.fetchone()
         
-        if ticket['status'] == 'VOIDED':
-            conn.close()
-            return jsonify({'error': 'Ticket is already voided'}), 400
+                # Nothing updated: the ticket is missing or already voided
+                if not ticket:
+                    cursor.execute(SQL_TICKET_STATUS, (ticket_id,))
+                    if cursor.fetchone() is None:
+                        return jsonify({'error': 'Ticket not found'}), 404
+                    return jsonify({'error': 'Ticket is already voided'}), 400
         
-        cursor.execute('UPDATE Tickets SET status = "VOIDED" WHERE ticket_id = ?', (ticket_id,))
-        cursor.execute('''
-            UPDATE EventSeatStatus 
-            SET status = 'AVAILABLE', updated_at = datetime('now')
-            WHERE event_id = ? AND seat_id = ?
-        ''', (ticket['event_id'], ticket['seat_id']))
+                cursor.execute(SQL_RELEASE_VOIDED_SEAT, (ticket['event_id'], ticket['seat_id']))
         
-        conn.commit()
-        conn.close()
+            invalidate_inventory(ticket['event_id'])
         
-        return jsonify({
-            'message': 'Ticket voided successfully',
-            'ticket_id': ticket_id,
-            'seat_id': ticket['seat_id']
-        }), 200
+            return jsonify({
+                'message': 'Ticket voided successfully',
+                'ticket_id': ticket_id,
+                'seat_id': ticket['seat_id']
+            }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
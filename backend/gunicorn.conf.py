@@ -0,0 +1,12 @@
+"""
+Gunicorn configuration for Tessera, picked up automatically by `gunicorn app:app`
+when started from the backend directory.
+"""
+import os
+
+# gevent workers patch sockets at startup, so requests waiting on Stripe or a
+# slow client yield to each other instead of tying up the whole worker.
+# SQLite calls still run to completion; keep them short.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
@@ -2,13 +2,667 @@
 Database initialization script for Tessera.
 Creates all tables and seeds with sample data for demo purposes.
 """
-import sqlite3
 import os
+import re
+import sqlite3
 
 # Use environment variable or default path (must match app.py)
 # Local dev: ../database/tessera.db | Production (Render): set DATABASE_PATH=data/tessera.db
 DB_PATH = os.environ.get('DATABASE_PATH', '../database/tessera.db')
 
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS Users (
+  user_id        INTEGER PRIMARY KEY,
+  username       TEXT NOT NULL UNIQUE,
+  email          TEXT NOT NULL UNIQUE,
+  password_hash  TEXT NOT NULL,
+  role           TEXT NOT NULL CHECK (role IN ('CUSTOMER','ADMIN')),
+  created_at     TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS Venues (
+  venue_id     INTEGER PRIMARY KEY,
+  venue_name   TEXT NOT NULL,
+  city         TEXT NOT NULL,
+  state        TEXT,
+  country      TEXT NOT NULL,
+  timezone     TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Events (
+  event_id          INTEGER PRIMARY KEY,
+  venue_id          INTEGER NOT NULL,
+  event_name        TEXT NOT NULL,
+  event_description TEXT,
+  start_datetime    TEXT NOT NULL,
+  image_url         TEXT,
+  status            TEXT NOT NULL CHECK (status IN ('SCHEDULED','ON_SALE','CANCELLED','COMPLETED')),
+  created_at        TEXT NOT NULL DEFAULT (datetime('now')),
+  FOREIGN KEY (venue_id) REFERENCES Venues(venue_id)
+    ON UPDATE CASCADE
+    ON DELETE RESTRICT
+);
+
+-- Backs the afterDate filter on the public event listing
+CREATE INDEX IF NOT EXISTS idx_events_start
+  ON Events(start_datetime);
+
+CREATE TABLE IF NOT EXISTS Seats (
+  seat_id      INTEGER PRIMARY KEY,
+  venue_id     INTEGER NOT NULL,
+  row_label    TEXT NOT NULL,
+  seat_number  TEXT NOT NULL,
+  col_index    INTEGER NOT NULL,
+  section      TEXT,
+  orientation  TEXT DEFAULT 'north' CHECK (orientation IN ('north','south','east','west')),
+  FOREIGN KEY (venue_id) REFERENCES Venues(venue_id)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE,
+  UNIQUE (venue_id, row_label, seat_number)
+);
+
+CREATE INDEX IF NOT EXISTS idx_seats_venue_row_col
+  ON Seats(venue_id, row_label, col_index);
+-- Covers picking seats by section (seat_id is the rowid, so it rides along)
+CREATE INDEX IF NOT EXISTS idx_seats_venue_section
+  ON Seats(venue_id, section);
+
+CREATE TABLE IF NOT EXISTS PriceTiers (
+  price_tier_id  INTEGER PRIMARY KEY,
+  event_id       INTEGER NOT NULL,
+  tier_code      TEXT NOT NULL,
+  tier_name      TEXT NOT NULL,
+  price_cents    INTEGER NOT NULL CHECK (price_cents >= 0),
+  FOREIGN KEY (event_id) REFERENCES Events(event_id)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE,
+  UNIQUE (event_id, tier_code)
+);
+
+CREATE TABLE IF NOT EXISTS SectionPricing (
+  event_id       INTEGER NOT NULL,
+  section        TEXT NOT NULL,
+  price_tier_id  INTEGER NOT NULL,
+  PRIMARY KEY (event_id, section),
+  FOREIGN KEY (event_id) REFERENCES Events(event_id)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE,
+  FOREIGN KEY (price_tier_id) REFERENCES PriceTiers(price_tier_id)
+    ON UPDATE CASCADE
+    ON DELETE RESTRICT
+);
+
+-- Covers the section -> price tier join without touching the table
+CREATE INDEX IF NOT EXISTS idx_sectionpricing_event_section_tier
+  ON SectionPricing(event_id, section, price_tier_id);
+
+CREATE TABLE IF NOT EXISTS Carts (
+  cart_id      INTEGER PRIMARY KEY,
+  user_id      INTEGER NOT NULL,
+  event_id     INTEGER NOT NULL,
+  status       TEXT NOT NULL CHECK (status IN ('OPEN','CONVERTED','EXPIRED')),
+  created_at   TEXT NOT NULL DEFAULT (datetime('now')),
+  expires_at   TEXT NOT NULL,
+  -- expires_at as unix milliseconds, compared on the checkout hot path
+  expires_at_epoch INTEGER,
+  FOREIGN KEY (user_id) REFERENCES Users(user_id)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE,
+  FOREIGN KEY (event_id) REFERENCES Events(event_id)
+    ON UPDATE CASCADE
+    ON DELETE RESTRICT
+);
+
+CREATE INDEX IF NOT EXISTS idx_carts_user_status
+  ON Carts(user_id, status);
+CREATE INDEX IF NOT EXISTS idx_carts_event_status
+  ON Carts(event_id, status);
+-- The open cart a user holds for an event, looked up on every reserve/release
+CREATE INDEX IF NOT EXISTS idx_carts_user_event_open
+  ON Carts(user_id, event_id) WHERE status = 'OPEN';
+
+CREATE TABLE IF NOT EXISTS CartSeats (
+  cart_id  INTEGER NOT NULL,
+  seat_id  INTEGER NOT NULL,
+  PRIMARY KEY (cart_id, seat_id),
+  FOREIGN KEY (cart_id) REFERENCES Carts(cart_id)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE,
+  FOREIGN KEY (seat_id) REFERENCES Seats(seat_id)
+    ON UPDATE CASCADE
+    ON DELETE RESTRICT
+);
+
+CREATE INDEX IF NOT EXISTS idx_cartseats_seat
+  ON CartSeats(seat_id);
+
+CREATE TABLE IF NOT EXISTS EventSeatStatus (
+  event_id         INTEGER NOT NULL,
+  seat_id          INTEGER NOT NULL,
+  status           TEXT NOT NULL CHECK (status IN ('AVAILABLE','HELD','SOLD')),
+  held_by_cart_id  INTEGER,
+  hold_expires_at  TEXT,
+  updated_at       TEXT NOT NULL DEFAULT (datetime('now')),
+  PRIMARY KEY (event_id, seat_id),
+  FOREIGN KEY (event_id) REFERENCES Events(event_id)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE,
+  FOREIGN KEY (seat_id) REFERENCES Seats(seat_id)
+    ON UPDATE CASCADE
+    ON DELETE RESTRICT,
+  FOREIGN KEY (held_by_cart_id) REFERENCES Carts(cart_id)
+    ON UPDATE CASCADE
+    ON DELETE SET NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_eventseatstatus_event_status
+  ON EventSeatStatus(event_id, status);
+-- Only live holds are swept for expiry, so only they are indexed
+CREATE INDEX IF NOT EXISTS idx_eventseatstatus_held_expiry
+  ON EventSeatStatus(hold_expires_at) WHERE status = 'HELD';
+-- Covers the per-seat status join in the seat map and inventory queries, and
+-- the held-by-this-cart checks at checkout, without touching the table
+CREATE INDEX IF NOT EXISTS idx_eventseatstatus_event_seat_cart
+  ON EventSeatStatus(event_id, seat_id, status, held_by_cart_id);
+
+CREATE TABLE IF NOT EXISTS Orders (
+  order_id     INTEGER PRIMARY KEY,
+  user_id      INTEGER NOT NULL,
+  event_id     INTEGER NOT NULL,
+  created_at   TEXT NOT NULL DEFAULT (datetime('now')),
+  status       TEXT NOT NULL CHECK (status IN ('PENDING','PAID','CANCELLED','REFUNDED')),
+  total_cents  INTEGER NOT NULL DEFAULT 0 CHECK (total_cents >= 0),
+  FOREIGN KEY (user_id) REFERENCES Users(user_id)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE,
+  FOREIGN KEY (event_id) REFERENCES Events(event_id)
+    ON UPDATE CASCADE
+    ON DELETE RESTRICT
+);
+
+-- Order history pages newest-first by order_id
+CREATE INDEX IF NOT EXISTS idx_orders_user_order
+  ON Orders(user_id, order_id);
+
+CREATE TABLE IF NOT EXISTS OrderItems (
+  order_item_id     INTEGER PRIMARY KEY,
+  order_id          INTEGER NOT NULL,
+  seat_id           INTEGER NOT NULL,
+  unit_price_cents  INTEGER NOT NULL CHECK (unit_price_cents >= 0),
+  line_total_cents  INTEGER NOT NULL CHECK (line_total_cents >= 0),
+  FOREIGN KEY (order_id) REFERENCES Orders(order_id)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE,
+  FOREIGN KEY (seat_id) REFERENCES Seats(seat_id)
+    ON UPDATE CASCADE
+    ON DELETE RESTRICT,
+  UNIQUE (order_id, seat_id)
+);
+
+CREATE TABLE IF NOT EXISTS Tickets (
+  ticket_id      INTEGER PRIMARY KEY,
+  order_item_id  INTEGER NOT NULL,
+  barcode_num    TEXT NOT NULL UNIQUE,
+  status         TEXT NOT NULL CHECK (status IN ('ISSUED','SCANNED','VOIDED')),
+  issued_at      TEXT NOT NULL DEFAULT (datetime('now')),
+  FOREIGN KEY (order_item_id) REFERENCES OrderItems(order_item_id)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_tickets_order_item
+  ON Tickets(order_item_id);
+"""
+
+# Each priced section of each event with its tier, as read by every pricing
+# lookup. Filtered by the triggers below to refresh only the affected rows.
+EVENT_SECTION_PRICE_SELECT = """
+  SELECT sp.event_id, sp.section, pt.price_cents, pt.tier_name
+  FROM SectionPricing sp
+  JOIN PriceTiers pt ON pt.price_tier_id = sp.price_tier_id
+"""
+
+# SectionPricing joined to PriceTiers, kept in sync by triggers, so a price
+# lookup is one primary-key seek instead of a two-table join
+SCHEMA_SQL += f"""
+CREATE TABLE IF NOT EXISTS EventSectionPrice (
+  event_id     INTEGER NOT NULL,
+  section      TEXT NOT NULL,
+  price_cents  INTEGER NOT NULL,
+  tier_name    TEXT NOT NULL,
+  PRIMARY KEY (event_id, section)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventsectionprice_pricing_insert
+AFTER INSERT ON SectionPricing
+BEGIN
+  INSERT INTO EventSectionPrice {EVENT_SECTION_PRICE_SELECT}
+  WHERE sp.event_id = NEW.event_id AND sp.section = NEW.section;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventsectionprice_pricing_update
+AFTER UPDATE ON SectionPricing
+BEGIN
+  DELETE FROM EventSectionPrice WHERE event_id = OLD.event_id AND section = OLD.section;
+  INSERT INTO EventSectionPrice {EVENT_SECTION_PRICE_SELECT}
+  WHERE sp.event_id = NEW.event_id AND sp.section = NEW.section;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventsectionprice_pricing_delete
+AFTER DELETE ON SectionPricing
+BEGIN
+  DELETE FROM EventSectionPrice WHERE event_id = OLD.event_id AND section = OLD.section;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventsectionprice_tier_update
+AFTER UPDATE OF price_cents, tier_name ON PriceTiers
+BEGIN
+  UPDATE EventSectionPrice SET price_cents = NEW.price_cents, tier_name = NEW.tier_name
+  WHERE event_id = NEW.event_id
+    AND section IN (SELECT section FROM SectionPricing WHERE price_tier_id = NEW.price_tier_id);
+END;
+"""
+
+# Every seat of every event with its availability and price, as served by the
+# seat map. Filtered by the triggers below to refresh only the affected rows.
+EVENT_SEAT_VIEW_SELECT = """
+  SELECT e.event_id, s.seat_id, s.row_label, s.seat_number, s.col_index, s.section,
+         COALESCE(ess.status, 'AVAILABLE'), esp.price_cents, esp.tier_name
+  FROM Events e
+  JOIN Seats s ON s.venue_id = e.venue_id
+  LEFT JOIN EventSeatStatus ess ON ess.event_id = e.event_id AND ess.seat_id = s.seat_id
+  LEFT JOIN EventSectionPrice esp ON esp.event_id = e.event_id AND esp.section = s.section
+"""
+
+# Denormalized seat map kept in sync by triggers, so GET /events/<id>/seats is
+# a single ordered range scan instead of a four-way join per request
+SCHEMA_SQL += f"""
+CREATE TABLE IF NOT EXISTS EventSeatView (
+  event_id      INTEGER NOT NULL,
+  seat_id       INTEGER NOT NULL,
+  row_label     TEXT NOT NULL,
+  seat_number   TEXT NOT NULL,
+  col_index     INTEGER NOT NULL,
+  section       TEXT,
+  availability  TEXT NOT NULL,
+  price_cents   INTEGER,
+  tier_name     TEXT,
+  PRIMARY KEY (event_id, row_label, col_index, seat_id)
+) WITHOUT ROWID;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_eventseatview_event_seat
+  ON EventSeatView(event_id, seat_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_eventseatview_event_insert
+AFTER INSERT ON Events
+BEGIN
+  INSERT INTO EventSeatView {EVENT_SEAT_VIEW_SELECT} WHERE e.event_id = NEW.event_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventseatview_event_venue
+AFTER UPDATE OF venue_id ON Events
+BEGIN
+  DELETE FROM EventSeatView WHERE event_id = OLD.event_id;
+  INSERT INTO EventSeatView {EVENT_SEAT_VIEW_SELECT} WHERE e.event_id = NEW.event_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventseatview_event_delete
+AFTER DELETE ON Events
+BEGIN
+  DELETE FROM EventSeatView WHERE event_id = OLD.event_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventseatview_seat_insert
+AFTER INSERT ON Seats
+BEGIN
+  INSERT INTO EventSeatView {EVENT_SEAT_VIEW_SELECT} WHERE s.seat_id = NEW.seat_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventseatview_seat_update
+AFTER UPDATE ON Seats
+BEGIN
+  DELETE FROM EventSeatView WHERE seat_id = OLD.seat_id;
+  INSERT INTO EventSeatView {EVENT_SEAT_VIEW_SELECT} WHERE s.seat_id = NEW.seat_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventseatview_seat_delete
+AFTER DELETE ON Seats
+BEGIN
+  DELETE FROM EventSeatView WHERE seat_id = OLD.seat_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventseatview_status_insert
+AFTER INSERT ON EventSeatStatus
+BEGIN
+  UPDATE EventSeatView SET availability = NEW.status
+  WHERE event_id = NEW.event_id AND seat_id = NEW.seat_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventseatview_status_update
+AFTER UPDATE OF status ON EventSeatStatus
+WHEN OLD.status IS NOT NEW.status
+BEGIN
+  UPDATE EventSeatView SET availability = NEW.status
+  WHERE event_id = NEW.event_id AND seat_id = NEW.seat_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventseatview_status_delete
+AFTER DELETE ON EventSeatStatus
+BEGIN
+  UPDATE EventSeatView SET availability = 'AVAILABLE'
+  WHERE event_id = OLD.event_id AND seat_id = OLD.seat_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventseatview_pricing_insert
+AFTER INSERT ON SectionPricing
+BEGIN
+  UPDATE EventSeatView
+  SET price_cents = (SELECT price_cents FROM PriceTiers WHERE price_tier_id = NEW.price_tier_id),
+      tier_name = (SELECT tier_name FROM PriceTiers WHERE price_tier_id = NEW.price_tier_id)
+  WHERE event_id = NEW.event_id AND section = NEW.section;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventseatview_pricing_update
+AFTER UPDATE ON SectionPricing
+BEGIN
+  UPDATE EventSeatView SET price_cents = NULL, tier_name = NULL
+  WHERE event_id = OLD.event_id AND section = OLD.section;
+  UPDATE EventSeatView
+  SET price_cents = (SELECT price_cents FROM PriceTiers WHERE price_tier_id = NEW.price_tier_id),
+      tier_name = (SELECT tier_name FROM PriceTiers WHERE price_tier_id = NEW.price_tier_id)
+  WHERE event_id = NEW.event_id AND section = NEW.section;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventseatview_pricing_delete
+AFTER DELETE ON SectionPricing
+BEGIN
+  UPDATE EventSeatView SET price_cents = NULL, tier_name = NULL
+  WHERE event_id = OLD.event_id AND section = OLD.section;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventseatview_tier_update
+AFTER UPDATE OF price_cents, tier_name ON PriceTiers
+BEGIN
+  UPDATE EventSeatView SET price_cents = NEW.price_cents, tier_name = NEW.tier_name
+  WHERE event_id = NEW.event_id
+    AND section IN (SELECT section FROM SectionPricing WHERE price_tier_id = NEW.price_tier_id);
+END;
+"""
+
+# Per-section seat counts for every event, rebuilt from EventSeatView. Sections
+# are stored as '' when a seat has none, since they are part of the primary key.
+EVENT_INVENTORY_SUMMARY_SELECT = """
+  SELECT event_id, IFNULL(section, ''), COUNT(*),
+         TOTAL(availability = 'AVAILABLE'), TOTAL(availability = 'HELD'),
+         TOTAL(availability = 'SOLD')
+  FROM EventSeatView
+  GROUP BY event_id, IFNULL(section, '')
+"""
+
+# Seat counts per (event, section) kept in step with EventSeatView by triggers,
+# so the inventory summary reads a few counters instead of aggregating every seat
+SCHEMA_SQL += """
+CREATE TABLE IF NOT EXISTS EventInventorySummary (
+  event_id     INTEGER NOT NULL,
+  section      TEXT NOT NULL,
+  total_seats  INTEGER NOT NULL,
+  available    INTEGER NOT NULL,
+  held         INTEGER NOT NULL,
+  sold         INTEGER NOT NULL,
+  PRIMARY KEY (event_id, section)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventinventorysummary_seat_insert
+AFTER INSERT ON EventSeatView
+BEGIN
+  INSERT INTO EventInventorySummary (event_id, section, total_seats, available, held, sold)
+  VALUES (NEW.event_id, IFNULL(NEW.section, ''), 1, NEW.availability = 'AVAILABLE',
+          NEW.availability = 'HELD', NEW.availability = 'SOLD')
+  ON CONFLICT (event_id, section) DO UPDATE SET
+    total_seats = total_seats + 1,
+    available = available + excluded.available,
+    held = held + excluded.held,
+    sold = sold + excluded.sold;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventinventorysummary_seat_delete
+AFTER DELETE ON EventSeatView
+BEGIN
+  UPDATE EventInventorySummary SET
+    total_seats = total_seats - 1,
+    available = available - (OLD.availability = 'AVAILABLE'),
+    held = held - (OLD.availability = 'HELD'),
+    sold = sold - (OLD.availability = 'SOLD')
+  WHERE event_id = OLD.event_id AND section = IFNULL(OLD.section, '');
+  DELETE FROM EventInventorySummary
+  WHERE event_id = OLD.event_id AND section = IFNULL(OLD.section, '') AND total_seats = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_eventinventorysummary_availability
+AFTER UPDATE OF availability ON EventSeatView
+WHEN OLD.availability IS NOT NEW.availability
+BEGIN
+  UPDATE EventInventorySummary SET
+    available = available + (NEW.availability = 'AVAILABLE') - (OLD.availability = 'AVAILABLE'),
+    held = held + (NEW.availability = 'HELD') - (OLD.availability = 'HELD'),
+    sold = sold + (NEW.availability = 'SOLD') - (OLD.availability = 'SOLD')
+  WHERE event_id = NEW.event_id AND section = IFNULL(NEW.section, '');
+END;
+"""
+
+# Every issued ticket with its owner, seat, event and venue, as served by
+# GET /tickets/<id>. Filtered by the triggers below to refresh only the affected rows.
+TICKET_VIEW_SELECT = """
+  SELECT t.ticket_id, o.user_id, o.event_id, t.barcode_num, t.status, t.issued_at,
+         oi.unit_price_cents, s.row_label, s.seat_number, s.section,
+         e.event_name, e.start_datetime, v.venue_name, v.city
+  FROM Tickets t
+  JOIN OrderItems oi ON oi.order_item_id = t.order_item_id
+  JOIN Orders o ON o.order_id = oi.order_id
+  JOIN Seats s ON s.seat_id = oi.seat_id
+  JOIN Events e ON e.event_id = o.event_id
+  LEFT JOIN Venues v ON v.venue_id = e.venue_id
+"""
+
+# Denormalized ticket details kept in sync by triggers, so a ticket lookup is a
+# single primary-key seek instead of a six-way join per request
+SCHEMA_SQL += f"""
+CREATE TABLE IF NOT EXISTS TicketView (
+  ticket_id         INTEGER PRIMARY KEY,
+  user_id           INTEGER NOT NULL,
+  event_id          INTEGER NOT NULL,
+  barcode_num       TEXT NOT NULL,
+  status            TEXT NOT NULL,
+  issued_at         TEXT NOT NULL,
+  unit_price_cents  INTEGER NOT NULL,
+  row_label         TEXT NOT NULL,
+  seat_number       TEXT NOT NULL,
+  section           TEXT,
+  event_name        TEXT NOT NULL,
+  start_datetime    TEXT NOT NULL,
+  venue_name        TEXT,
+  city              TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_ticketview_event
+  ON TicketView(event_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_ticketview_ticket_insert
+AFTER INSERT ON Tickets
+BEGIN
+  INSERT INTO TicketView {TICKET_VIEW_SELECT} WHERE t.ticket_id = NEW.ticket_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ticketview_ticket_status
+AFTER UPDATE OF status ON Tickets
+WHEN OLD.status IS NOT NEW.status
+BEGIN
+  UPDATE TicketView SET status = NEW.status WHERE ticket_id = NEW.ticket_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ticketview_ticket_delete
+AFTER DELETE ON Tickets
+BEGIN
+  DELETE FROM TicketView WHERE ticket_id = OLD.ticket_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ticketview_order_update
+AFTER UPDATE OF user_id, event_id ON Orders
+BEGIN
+  DELETE FROM TicketView WHERE ticket_id IN (
+    SELECT t.ticket_id FROM Tickets t
+    JOIN OrderItems oi ON oi.order_item_id = t.order_item_id
+    WHERE oi.order_id = NEW.order_id
+  );
+  INSERT INTO TicketView {TICKET_VIEW_SELECT} WHERE o.order_id = NEW.order_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ticketview_seat_update
+AFTER UPDATE OF row_label, seat_number, section ON Seats
+BEGIN
+  UPDATE TicketView
+  SET row_label = NEW.row_label, seat_number = NEW.seat_number, section = NEW.section
+  WHERE ticket_id IN (
+    SELECT t.ticket_id FROM Tickets t
+    JOIN OrderItems oi ON oi.order_item_id = t.order_item_id
+    WHERE oi.seat_id = NEW.seat_id
+  );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ticketview_event_update
+AFTER UPDATE OF event_name, start_datetime, venue_id ON Events
+BEGIN
+  DELETE FROM TicketView WHERE event_id = OLD.event_id;
+  INSERT INTO TicketView {TICKET_VIEW_SELECT} WHERE e.event_id = NEW.event_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ticketview_venue_update
+AFTER UPDATE OF venue_name, city ON Venues
+BEGIN
+  UPDATE TicketView SET venue_name = NEW.venue_name, city = NEW.city
+  WHERE event_id IN (SELECT event_id FROM Events WHERE venue_id = NEW.venue_id);
+END;
+"""
+
+
+def refresh_event_section_price(cursor):
+    """Rebuild EventSectionPrice from the source tables (the triggers keep it current after)."""
+    cursor.execute("DELETE FROM EventSectionPrice")
+    cursor.execute(f"INSERT INTO EventSectionPrice {EVENT_SECTION_PRICE_SELECT}")
+
+
+def refresh_event_seat_view(cursor):
+    """Rebuild EventSeatView from the source tables (the triggers keep it current after)."""
+    cursor.execute("DELETE FROM EventSeatView")
+    cursor.execute(f"INSERT INTO EventSeatView {EVENT_SEAT_VIEW_SELECT}")
+
+
+def refresh_event_inventory_summary(cursor):
+    """Rebuild EventInventorySummary from EventSeatView (the triggers keep it current after)."""
+    cursor.execute("DELETE FROM EventInventorySummary")
+    cursor.execute(f"INSERT INTO EventInventorySummary {EVENT_INVENTORY_SUMMARY_SELECT}")
+
+
+def refresh_ticket_view(cursor):
+    """Rebuild TicketView from the source tables (the triggers keep it current after)."""
+    cursor.execute("DELETE FROM TicketView")
+    cursor.execute(f"INSERT INTO TicketView {TICKET_VIEW_SELECT}")
+
+
+def split_statements(sql):
+    """Split a SQL script into its complete statements."""
+    statements, pending = [], ''
+    for line in sql.splitlines(keepends=True):
+        pending += line
+        if sqlite3.complete_statement(pending):
+            statements.append(pending.strip())
+            pending = ''
+    return statements
+
+
+def schema_statements(table):
+    """Return the SCHEMA_SQL statements that create a table and its indexes."""
+    statements = split_statements(SCHEMA_SQL)
+    pattern = re.compile(rf'\b(?:EXISTS|ON)\s+{table}\b')
+    return [s for s in statements if pattern.search(s.split('(', 1)[0])]
+
+
+def rebuild_table(conn, table):
+    """
+    Recreate a table from SCHEMA_SQL, keeping its rows. SQLite cannot alter
+    constraints in place, so the old table is renamed, copied and dropped.
+    """
+    old_table = f'_{table}_old'
+    cursor = conn.cursor()
+    cursor.execute('PRAGMA foreign_keys = OFF')
+    # Keep other tables' REFERENCES clauses pointing at the original name
+    cursor.execute('PRAGMA legacy_alter_table = ON')
+    try:
+        cursor.execute('BEGIN')
+        cursor.execute(f'ALTER TABLE {table} RENAME TO {old_table}')
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE tbl_name = ? AND type = 'index' AND sql IS NOT NULL",
+            (old_table,)
+        )
+        for (index_name,) in cursor.fetchall():
+            cursor.execute(f'DROP INDEX {index_name}')
+        for statement in schema_statements(table):
+            cursor.execute(statement)
+
+        old_columns = {row[1] for row in cursor.execute(f'PRAGMA table_info({old_table})')}
+        columns = ', '.join(
+            row[1] for row in cursor.execute(f'PRAGMA table_info({table})') if row[1] in old_columns
+        )
+        cursor.execute(f'INSERT INTO {table} ({columns}) SELECT {columns} FROM {old_table}')
+        cursor.execute(f'DROP TABLE {old_table}')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute('PRAGMA legacy_alter_table = OFF')
+        cursor.execute('PRAGMA foreign_keys = ON')
+
+
+def migrate_schema(conn):
+    """Bring tables created by older versions of this script up to SCHEMA_SQL."""
+    # Carts and Orders used to block user deletion instead of cascading
+    for table in ('Carts', 'Orders'):
+        user_fk = [
+            fk for fk in conn.execute(f'PRAGMA foreign_key_list({table})')
+            if fk[2] == 'Users'
+        ]
+        if user_fk and user_fk[0][6] != 'CASCADE':
+            rebuild_table(conn, table)
+            print(f"Migrated {table}: user deletes now cascade")
+
+    # The hold expiry index became partial (HELD rows only) under a new name
+    conn.execute('DROP INDEX IF EXISTS idx_eventseatstatus_hold_expiry')
+    # The per-seat status index grew held_by_cart_id under a new name
+    conn.execute('DROP INDEX IF EXISTS idx_eventseatstatus_event_seat_status')
+    # Order history switched from created_at to order_id keyset paging
+    conn.execute('DROP INDEX IF EXISTS idx_orders_user_created')
+
+    # Carts gained an integer copy of expires_at
+    cart_columns = {row[1] for row in conn.execute('PRAGMA table_info(Carts)')}
+    if cart_columns and 'expires_at_epoch' not in cart_columns:
+        conn.execute('ALTER TABLE Carts ADD COLUMN expires_at_epoch INTEGER')
+        print("Migrated Carts: added expires_at_epoch")
+    if cart_columns:
+        conn.execute('''
+            UPDATE Carts
+            SET expires_at_epoch = CAST(ROUND((julianday(expires_at) - 2440587.5) * 86400000) AS INTEGER)
+            WHERE expires_at_epoch IS NULL
+        ''')
+
+
+def enable_wal(conn):
+    """Switch the database file to WAL; the setting persists for the app's connections."""
+    journal_mode = conn.execute("PRAGMA journal_mode = WAL;").fetchone()[0]
+    if journal_mode.lower() != 'wal':
+        print(f"Warning: journal_mode is {journal_mode}, not WAL; readers will block on writes")
+
+
 def init_database():
     """Initialize the database with schema and sample data."""
     # Create data directory if it doesn't exist
@@ -16,211 +670,74 @@ def init_database():
     if db_dir:
         os.makedirs(db_dir, exist_ok=True)
     
-    conn = sqlite3.connect(DB_PATH)
+    # A new database is built in memory and written out in one pass by VACUUM INTO
+    fresh = not os.path.exists(DB_PATH)
+    conn = sqlite3.connect(':memory:' if fresh else DB_PATH)
     cursor = conn.cursor()
 
     # Enable foreign keys
     cursor.execute("PRAGMA foreign_keys = ON;")
+    if not fresh:
+        enable_wal(conn)
+    # Per-connection settings matching the app's pool: safe under WAL, and init
+    # waits out a running app's write lock instead of failing
+    cursor.execute("PRAGMA synchronous = NORMAL;")
+    cursor.execute("PRAGMA busy_timeout = 5000;")
+    cursor.execute("PRAGMA temp_store = MEMORY;")
+    cursor.execute("PRAGMA cache_size = -65536;")
 
-    # Create tables
-    cursor.executescript("""
-    CREATE TABLE IF NOT EXISTS Users (
-      user_id        INTEGER PRIMARY KEY,
-      username       TEXT NOT NULL UNIQUE,
-      email          TEXT NOT NULL UNIQUE,
-      password_hash  TEXT NOT NULL,
-      role           TEXT NOT NULL CHECK (role IN ('CUSTOMER','ADMIN')),
-      created_at     TEXT NOT NULL DEFAULT (datetime('now'))
-    );
-
-    CREATE TABLE IF NOT EXISTS Venues (
-      venue_id     INTEGER PRIMARY KEY,
-      venue_name   TEXT NOT NULL,
-      city         TEXT NOT NULL,
-      state        TEXT,
-      country      TEXT NOT NULL,
-      timezone     TEXT NOT NULL
-    );
-
-    CREATE TABLE IF NOT EXISTS Events (
-      event_id          INTEGER PRIMARY KEY,
-      venue_id          INTEGER NOT NULL,
-      event_name        TEXT NOT NULL,
-      event_description TEXT,
-      start_datetime    TEXT NOT NULL,
-      image_url         TEXT,
-      status            TEXT NOT NULL CHECK (status IN ('SCHEDULED','ON_SALE','CANCELLED','COMPLETED')),
-      created_at        TEXT NOT NULL DEFAULT (datetime('now')),
-      FOREIGN KEY (venue_id) REFERENCES Venues(venue_id)
-        ON UPDATE CASCADE
-        ON DELETE RESTRICT
-    );
-
-    CREATE TABLE IF NOT EXISTS Seats (
-      seat_id      INTEGER PRIMARY KEY,
-      venue_id     INTEGER NOT NULL,
-      row_label    TEXT NOT NULL,
-      seat_number  TEXT NOT NULL,
-      col_index    INTEGER NOT NULL,
-      section      TEXT,
-      orientation  TEXT DEFAULT 'north' CHECK (orientation IN ('north','south','east','west')),
-      FOREIGN KEY (venue_id) REFERENCES Venues(venue_id)
-        ON UPDATE CASCADE
-        ON DELETE CASCADE,
-      UNIQUE (venue_id, row_label, seat_number)
-    );
-
-    CREATE INDEX IF NOT EXISTS idx_seats_venue_row_col
-      ON Seats(venue_id, row_label, col_index);
-
-    CREATE TABLE IF NOT EXISTS PriceTiers (
-      price_tier_id  INTEGER PRIMARY KEY,
-      event_id       INTEGER NOT NULL,
-      tier_code      TEXT NOT NULL,
-      tier_name      TEXT NOT NULL,
-      price_cents    INTEGER NOT NULL CHECK (price_cents >= 0),
-      FOREIGN KEY (event_id) REFERENCES Events(event_id)
-        ON UPDATE CASCADE
-        ON DELETE CASCADE,
-      UNIQUE (event_id, tier_code)
-    );
-
-    CREATE TABLE IF NOT EXISTS SectionPricing (
-      event_id       INTEGER NOT NULL,
-      section        TEXT NOT NULL,
-      price_tier_id  INTEGER NOT NULL,
-      PRIMARY KEY (event_id, section),
-      FOREIGN KEY (event_id) REFERENCES Events(event_id)
-        ON UPDATE CASCADE
-        ON DELETE CASCADE,
-      FOREIGN KEY (price_tier_id) REFERENCES PriceTiers(price_tier_id)
-        ON UPDATE CASCADE
-        ON DELETE RESTRICT
-    );
-
-    CREATE TABLE IF NOT EXISTS Carts (
-      cart_id      INTEGER PRIMARY KEY,
-      user_id      INTEGER NOT NULL,
-      event_id     INTEGER NOT NULL,
-      status       TEXT NOT NULL CHECK (status IN ('OPEN','CONVERTED','EXPIRED')),
-      created_at   TEXT NOT NULL DEFAULT (datetime('now')),
-      expires_at   TEXT NOT NULL,
-      FOREIGN KEY (user_id) REFERENCES Users(user_id)
-        ON UPDATE CASCADE
-        ON DELETE RESTRICT,
-      FOREIGN KEY (event_id) REFERENCES Events(event_id)
-        ON UPDATE CASCADE
-        ON DELETE RESTRICT
-    );
-
-    CREATE INDEX IF NOT EXISTS idx_carts_user_status
-      ON Carts(user_id, status);
-    CREATE INDEX IF NOT EXISTS idx_carts_event_status
-      ON Carts(event_id, status);
-
-    CREATE TABLE IF NOT EXISTS CartSeats (
-      cart_id  INTEGER NOT NULL,
-      seat_id  INTEGER NOT NULL,
-      PRIMARY KEY (cart_id, seat_id),
-      FOREIGN KEY (cart_id) REFERENCES Carts(cart_id)
-        ON UPDATE CASCADE
-        ON DELETE CASCADE,
-      FOREIGN KEY (seat_id) REFERENCES Seats(seat_id)
-        ON UPDATE CASCADE
-        ON DELETE RESTRICT
-    );
-
-    CREATE INDEX IF NOT EXISTS idx_cartseats_seat
-      ON CartSeats(seat_id);
-
-    CREATE TABLE IF NOT EXISTS EventSeatStatus (
-      event_id         INTEGER NOT NULL,
-      seat_id          INTEGER NOT NULL,
-      status           TEXT NOT NULL CHECK (status IN ('AVAILABLE','HELD','SOLD')),
-      held_by_cart_id  INTEGER,
-      hold_expires_at  TEXT,
-      updated_at       TEXT NOT NULL DEFAULT (datetime('now')),
-      PRIMARY KEY (event_id, seat_id),
-      FOREIGN KEY (event_id) REFERENCES Events(event_id)
-        ON UPDATE CASCADE
-        ON DELETE CASCADE,
-      FOREIGN KEY (seat_id) REFERENCES Seats(seat_id)
-        ON UPDATE CASCADE
-        ON DELETE RESTRICT,
-      FOREIGN KEY (held_by_cart_id) REFERENCES Carts(cart_id)
-        ON UPDATE CASCADE
-        ON DELETE SET NULL
-    );
-
-    CREATE INDEX IF NOT EXISTS idx_eventseatstatus_event_status
-      ON EventSeatStatus(event_id, status);
-    CREATE INDEX IF NOT EXISTS idx_eventseatstatus_hold_expiry
-      ON EventSeatStatus(hold_expires_at);
-
-    CREATE TABLE IF NOT EXISTS Orders (
-      order_id     INTEGER PRIMARY KEY,
-      user_id      INTEGER NOT NULL,
-      event_id     INTEGER NOT NULL,
-      created_at   TEXT NOT NULL DEFAULT (datetime('now')),
-      status       TEXT NOT NULL CHECK (status IN ('PENDING','PAID','CANCELLED','REFUNDED')),
-      total_cents  INTEGER NOT NULL DEFAULT 0 CHECK (total_cents >= 0),
-      FOREIGN KEY (user_id) REFERENCES Users(user_id)
-        ON UPDATE CASCADE
-        ON DELETE RESTRICT,
-      FOREIGN KEY (event_id) REFERENCES Events(event_id)
-        ON UPDATE CASCADE
-        ON DELETE RESTRICT
-    );
-
-    CREATE INDEX IF NOT EXISTS idx_orders_user_created
-      ON Orders(user_id, created_at);
-
-    CREATE TABLE IF NOT EXISTS OrderItems (
-      order_item_id     INTEGER PRIMARY KEY,
-      order_id          INTEGER NOT NULL,
-      seat_id           INTEGER NOT NULL,
-      unit_price_cents  INTEGER NOT NULL CHECK (unit_price_cents >= 0),
-      line_total_cents  INTEGER NOT NULL CHECK (line_total_cents >= 0),
-      FOREIGN KEY (order_id) REFERENCES Orders(order_id)
-        ON UPDATE CASCADE
-        ON DELETE CASCADE,
-      FOREIGN KEY (seat_id) REFERENCES Seats(seat_id)
-        ON UPDATE CASCADE
-        ON DELETE RESTRICT,
-      UNIQUE (order_id, seat_id)
-    );
-
-    CREATE TABLE IF NOT EXISTS Tickets (
-      ticket_id      INTEGER PRIMARY KEY,
-      order_item_id  INTEGER NOT NULL,
-      barcode_num    TEXT NOT NULL UNIQUE,
-      status         TEXT NOT NULL CHECK (status IN ('ISSUED','SCANNED','VOIDED')),
-      issued_at      TEXT NOT NULL DEFAULT (datetime('now')),
-      FOREIGN KEY (order_item_id) REFERENCES OrderItems(order_item_id)
-        ON UPDATE CASCADE
-        ON DELETE CASCADE
-    );
-
-    CREATE INDEX IF NOT EXISTS idx_tickets_order_item
-      ON Tickets(order_item_id);
-    """)
+    # Migrate existing tables first so SCHEMA_SQL's indexes find their columns
+    migrate_schema(conn)
+    # Create tables. Plain indexes wait until after the seed so each is built in
+    # one sorted pass; unique indexes stay up front for the triggers' upserts.
+    statements = split_statements(SCHEMA_SQL)
+    deferred_indexes = [s for s in statements if re.search(r'^CREATE INDEX', s, re.M)]
+    cursor.executescript('\n'.join(s for s in statements if s not in deferred_indexes))
 
     # Check if we need to seed data
-    cursor.execute("SELECT COUNT(*) FROM Venues")
-    if cursor.fetchone()[0] == 0:
+    cursor.execute("SELECT 1 FROM Venues LIMIT 1")
+    if cursor.fetchone() is None:
+        # The seed is consistent by construction, so its foreign keys are checked
+        # once afterwards instead of per row. The pragma is a no-op inside a
+        # transaction, so it is set before BEGIN.
+        cursor.execute("PRAGMA foreign_keys = OFF;")
+        # One transaction for the whole seed, committed with the rebuilds below
+        cursor.execute("BEGIN")
         seed_data(cursor)
+        violations = cursor.execute("PRAGMA foreign_key_check").fetchall()
+        if violations:
+            raise RuntimeError(f"Seed data violates foreign keys: {violations[:5]}")
+
+    for statement in deferred_indexes:
+        cursor.execute(statement)
+
+    # EventSeatView reads prices from EventSectionPrice, so that is rebuilt first
+    refresh_event_section_price(cursor)
+    refresh_event_seat_view(cursor)
+    refresh_event_inventory_summary(cursor)
+    refresh_ticket_view(cursor)
+
+    # Table statistics let the planner pick the right index for each join
+    cursor.execute("ANALYZE")
 
     conn.commit()
+    cursor.execute("PRAGMA foreign_keys = ON;")
+    if fresh:
+        cursor.execute("VACUUM INTO ?", (DB_PATH,))
+        conn.close()
+        conn = sqlite3.connect(DB_PATH)
+        enable_wal(conn)
     conn.close()
     print(f"Database initialized at: {DB_PATH}")
 
 def seed_data(cursor):
     """Seed the database with sample data."""
-    # Venues
-    cursor.executescript("""
-    INSERT INTO Venues VALUES(1,'The Anthem','Washington','DC','US','America/New_York');
-    INSERT INTO Venues VALUES(2,'Capital One Arena','Washington','DC','US','America/New_York');
-    INSERT INTO Venues VALUES(3,'Merriweather Post Pavilion','Columbia','MD','US','America/New_York');
+    # Venues (executescript would commit the caller's open transaction)
+    cursor.execute("""
+    INSERT INTO Venues VALUES
+        (1,'The Anthem','Washington','DC','US','America/New_York'),
+        (2,'Capital One Arena','Washington','DC','US','America/New_York'),
+        (3,'Merriweather Post Pavilion','Columbia','MD','US','America/New_York')
     """)
 
     # Events with various artists
@@ -237,85 +754,51 @@ def seed_data(cursor):
         (1010, 1, 'Ariana Grande — Pop Night', 'Live performance event.', '2026-02-14 19:00:00', 'https://images.unsplash.com/photo-1506157786151-b8491531f063?w=800', 'ON_SALE'),
     ]
     
-    for event in events:
-        cursor.execute(
-            "INSERT INTO Events (event_id, venue_id, event_name, event_description, start_datetime, image_url, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            event
-        )
+    cursor.executemany(
+        "INSERT INTO Events (event_id, venue_id, event_name, event_description, start_datetime, image_url, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        events
+    )
 
-    # Create seats for each venue (10 rows x 15 seats each)
-    seat_id = 1
-    for venue_id in [1, 2, 3]:
-        rows = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J']
-        for row_idx, row_label in enumerate(rows):
-            # Determine section based on row
-            if row_idx < 3:
-                section = 'VIP'
-            elif row_idx < 6:
-                section = 'PREMIUM'
-            else:
-                section = 'STANDARD'
-            
-            for col in range(1, 16):
-                cursor.execute(
-                    "INSERT INTO Seats (seat_id, venue_id, row_label, seat_number, col_index, section) VALUES (?, ?, ?, ?, ?, ?)",
-                    (seat_id, venue_id, row_label, str(col), col, section)
-                )
-                seat_id += 1
-
-    # Create price tiers for each event
-    price_tier_id = 1
-    for event_id in range(1001, 1011):
-        cursor.execute(
-            "INSERT INTO PriceTiers (price_tier_id, event_id, tier_code, tier_name, price_cents) VALUES (?, ?, 'VIP', 'VIP Seating', 15000)",
-            (price_tier_id, event_id)
-        )
-        price_tier_id += 1
-        cursor.execute(
-            "INSERT INTO PriceTiers (price_tier_id, event_id, tier_code, tier_name, price_cents) VALUES (?, ?, 'PREMIUM', 'Premium Seating', 10000)",
-            (price_tier_id, event_id)
-        )
-        price_tier_id += 1
-        cursor.execute(
-            "INSERT INTO PriceTiers (price_tier_id, event_id, tier_code, tier_name, price_cents) VALUES (?, ?, 'STANDARD', 'Standard Seating', 5000)",
-            (price_tier_id, event_id)
-        )
-        price_tier_id += 1
+    # Create seats for each venue (10 rows x 15 seats each): rows A-C are VIP,
+    # D-F PREMIUM and G-J STANDARD. seat_id is the rowid, assigned in insert order
+    # venue by venue, row by row
+    cursor.execute("""
+    WITH RECURSIVE
+        venue(venue_id) AS (VALUES (1), (2), (3)),
+        seat_row(row_idx) AS (SELECT 0 UNION ALL SELECT row_idx + 1 FROM seat_row WHERE row_idx < 9),
+        seat_col(col) AS (SELECT 1 UNION ALL SELECT col + 1 FROM seat_col WHERE col < 15)
+    INSERT INTO Seats (venue_id, row_label, seat_number, col_index, section)
+    SELECT venue_id, char(65 + row_idx), CAST(col AS TEXT), col,
+           CASE WHEN row_idx < 3 THEN 'VIP' WHEN row_idx < 6 THEN 'PREMIUM' ELSE 'STANDARD' END
+    FROM venue, seat_row, seat_col
+    ORDER BY venue_id, row_idx, col
+    """)
 
-    # Create section pricing for each event
-    price_tier_offset = 0
-    for event_id in range(1001, 1011):
-        base_tier = 1 + price_tier_offset
-        cursor.execute(
-            "INSERT INTO SectionPricing (event_id, section, price_tier_id) VALUES (?, 'VIP', ?)",
-            (event_id, base_tier)
-        )
-        cursor.execute(
-            "INSERT INTO SectionPricing (event_id, section, price_tier_id) VALUES (?, 'PREMIUM', ?)",
-            (event_id, base_tier + 1)
-        )
-        cursor.execute(
-            "INSERT INTO SectionPricing (event_id, section, price_tier_id) VALUES (?, 'STANDARD', ?)",
-            (event_id, base_tier + 2)
-        )
-        price_tier_offset += 3
-
-    # Initialize EventSeatStatus for all events
-    # Get venue_id for each event
-    event_venues = {
-        1001: 1, 1002: 2, 1003: 3, 1004: 1, 1005: 2,
-        1006: 3, 1007: 1, 1008: 2, 1009: 3, 1010: 1
-    }
-    
-    for event_id, venue_id in event_venues.items():
-        # Get all seats for this venue
-        cursor.execute("SELECT seat_id FROM Seats WHERE venue_id = ?", (venue_id,))
-        seats = cursor.fetchall()
-        for (seat_id,) in seats:
-            cursor.execute(
-                "INSERT INTO EventSeatStatus (event_id, seat_id, status) VALUES (?, ?, 'AVAILABLE')",
-                (event_id, seat_id)
-            )
+    # Create price tiers for each event, and price each section at its tier
+    cursor.execute("""
+    WITH tier(position, tier_code, tier_name, price_cents) AS (
+        VALUES (1, 'VIP', 'VIP Seating', 15000),
+               (2, 'PREMIUM', 'Premium Seating', 10000),
+               (3, 'STANDARD', 'Standard Seating', 5000)
+    )
+    INSERT INTO PriceTiers (event_id, tier_code, tier_name, price_cents)
+    SELECT e.event_id, t.tier_code, t.tier_name, t.price_cents
+    FROM Events e, tier t
+    ORDER BY e.event_id, t.position
+    """)
+    # Sections are named after their tier codes
+    cursor.execute("""
+    INSERT INTO SectionPricing (event_id, section, price_tier_id)
+    SELECT event_id, tier_code, price_tier_id FROM PriceTiers ORDER BY price_tier_id
+    """)
+
+    # Initialize EventSeatStatus for all events: every seat at the event's venue
+    cursor.execute("""
+    INSERT INTO EventSeatStatus (event_id, seat_id, status)
+    SELECT e.event_id, s.seat_id, 'AVAILABLE'
+    FROM Events e
+    JOIN Seats s ON s.venue_id = e.venue_id
+    """)
 
     print("Sample data seeded successfully!")
 